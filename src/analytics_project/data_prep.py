@@ -7,19 +7,40 @@ the DataScrubber class to process raw customer, product, and sales data
 before it is loaded into the Data Warehouse.
 """
 
+import hashlib
+import json
+import os
 import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
 from .utils_logger import init_logger, logger, project_root
 
 # Import the completed DataScrubber class from the new path src/utils/
 from ..utils.data_scrubber import DataScrubber
-from typing import Dict, Any
+from ..utils.data_writer import write_prepared_data
+from ..utils.polars_pipeline import run_lazy_pipeline
+from typing import Callable, Dict, Any, Iterator, List, Tuple
 
 # Set up paths as constants
 DATA_DIR: pathlib.Path = project_root.joinpath("data")
 RAW_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("raw")
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("prepared")
 
+# Files larger than this are cleaned chunk by chunk instead of loaded whole
+STREAM_THRESHOLD_BYTES: int = 256 * 1024 * 1024
+CHUNK_SIZE: int = 250_000
+# Text cells that stream_process hashes as numbers (see stable_row_hashes)
+NUMBER_PATTERN: str = r"^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$"
+# Below this total raw size, starting worker processes costs more than it saves
+PARALLEL_THRESHOLD_BYTES: int = 16 * 1024 * 1024
+
 
 # --- Data Configuration (Based on the provided structure) ---
 # These mappings define how we want the data to be cleaned and formatted.
@@ -43,13 +64,107 @@ SALE_TYPE_MAPPING: Dict[str, Any] = {
     'DiscountPercent': 'float',
 }
 
+# Parser options for each file: NA tokens and dates are handled by the parser
+# in one pass instead of being fixed up after loading. Numeric columns are not
+# pinned to a dtype: one malformed cell (e.g. '$321.87') would fail the whole
+# read, so the cleaners coerce them with pd.to_numeric(errors='coerce') instead.
+NA_VALUES: List[str] = ['?', 'NULL', 'null', '', 'NaN']
+
+CUSTOMER_READ: Dict[str, Any] = {
+    'na_values': NA_VALUES,
+    'parse_dates': ['JoinDate'],
+}
+
+PRODUCT_READ: Dict[str, Any] = {
+    'na_values': NA_VALUES,
+}
+
+SALES_READ: Dict[str, Any] = {
+    'dtype': {'ProductID': 'string'},
+    'na_values': NA_VALUES,
+    'parse_dates': ['SaleDate'],
+}
+
+# Numeric columns coerced by each cleaner; garbage values become NaN.
+# DiscountPercent is handled separately because values like '6%' need the sign stripped.
+CUSTOMER_NUMERIC_COLUMNS: List[str] = ['CustomerID', 'LoyaltyPoints']
+PRODUCT_NUMERIC_COLUMNS: List[str] = ['UnitPrice', 'StockQuantity']
+SALES_NUMERIC_COLUMNS: List[str] = ['TransactionID', 'CustomerID', 'SaleAmount']
+
+# Schema overrides for the Polars backend: the same types as the *_READ options,
+# with date and percent columns kept as text for the lazy cleaners to parse.
+CUSTOMER_SCHEMA: Dict[str, Any] = {
+    'CustomerID': pl.Int64,
+    'JoinDate': pl.String,
+    'LoyaltyPoints': pl.Int64,
+}
+
+PRODUCT_SCHEMA: Dict[str, Any] = {'UnitPrice': pl.Float64, 'StockQuantity': pl.Int64}
+
+SALES_SCHEMA: Dict[str, Any] = {
+    'TransactionID': pl.Int64,
+    'SaleDate': pl.String,
+    'CustomerID': pl.Int64,
+    'ProductID': pl.String,
+    'CampaignID': pl.Float64,
+    'SaleAmount': pl.Float64,
+    'DiscountPercent': pl.String,
+}
+
+
+def coerce_numeric_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Convert the given columns to numbers, turning values that do not parse into NaN."""
+    return df.assign(**{col: pd.to_numeric(df[col], errors='coerce') for col in columns})
+
+
+def to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Store the text columns of a DataFrame as Arrow-backed strings.
+
+    The .str methods used while cleaning then run as vectorized Arrow kernels
+    instead of calling Python string methods one cell at a time.
+    """
+    text_cols = df.select_dtypes(include="object").columns
+    return df.astype(dict.fromkeys(text_cols, "string[pyarrow]"))
+
+
+def read_cache_path(path: pathlib.Path, read_kwargs: Dict[str, Any] | None = None) -> pathlib.Path:
+    """Return the Parquet cache file for a CSV read with the given read options.
+
+    A short hash of the options is part of the file name, so reading the same
+    CSV with other dtypes, NA tokens or date columns does not reuse the cache.
+    """
+    options = json.dumps(read_kwargs or {}, sort_keys=True, default=str)
+    digest = hashlib.sha256(options.encode("utf-8")).hexdigest()[:12]
+    return path.with_name(f"{path.stem}.{digest}.parquet")
+
+
+def read_data(path: pathlib.Path, read_kwargs: Dict[str, Any] | None = None) -> pd.DataFrame:
+    """Read a CSV at the given path into a DataFrame, with error handling.
 
-def read_data(path: pathlib.Path) -> pd.DataFrame:
-    """Read a CSV at the given path into a DataFrame, with error handling."""
+    The parsed frame is cached as a Parquet file next to the CSV, keyed by the
+    read options. Later runs read the cache instead, until the CSV is modified
+    again. Only the newest cache is kept: writing one removes the CSV's others.
+    """
     try:
-        logger.info(f"Reading raw data from {path}.")
-        # Reading with specific parameters if separators are not commas
-        df = pd.read_csv(path)
+        cache_path = read_cache_path(path, read_kwargs)
+        if cache_path.exists() and cache_path.stat().st_mtime >= path.stat().st_mtime:
+            logger.info(f"Reading cached raw data from {cache_path}.")
+            df = pd.read_parquet(cache_path, engine="pyarrow")
+        else:
+            logger.info(f"Reading raw data from {path}.")
+            # Dtypes, NA tokens and date columns are passed straight to the parser;
+            # the pyarrow engine parses blocks of the file on all cores
+            df = pd.read_csv(path, engine="pyarrow", **(read_kwargs or {}))
+            try:
+                df.to_parquet(cache_path, engine="pyarrow", compression="zstd", index=False)
+                for stale_path in path.parent.glob(f"{path.stem}.*.parquet"):
+                    if stale_path != cache_path:
+                        stale_path.unlink(missing_ok=True)
+            except Exception as e:
+                # The cache only saves time on the next run; never fail the read over it
+                logger.warning(f"Could not cache {path.name} as Parquet: {e}")
+
+        df = to_arrow_strings(df)
         logger.info(
             f"{path.name}: loaded DataFrame with shape {df.shape[0]} rows x {df.shape[1]} cols"
         )
@@ -68,12 +183,86 @@ def save_prepared_data(df: pd.DataFrame, filename: str) -> None:
     save_path = PREPARED_DATA_DIR.joinpath(filename)
 
     try:
-        df.to_csv(save_path, index=False)
+        write_prepared_data(df, save_path)
         logger.info(f"Successfully saved prepared data to {save_path.name}")
     except Exception as e:
         logger.error(f"Error saving data to {save_path.name}: {e}")
 
 
+def stable_row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash each row of df so equal values hash alike whatever dtype a chunk inferred.
+
+    The C parser infers dtypes per chunk: a column with a missing value is
+    float64 in one chunk and int64 in the next, and a stray text cell makes it
+    object. Numbers are hashed as float64, and in object columns the cells
+    that look like numbers are too, so 2, 2.0 and '2' hash the same. The
+    number check is an Arrow regex, much faster than pd.to_numeric on text.
+    """
+    column_hashes = {}
+    for col, values in df.items():
+        if pd.api.types.is_numeric_dtype(values) and values.dtype != bool:
+            numbers = values.to_numpy(dtype="float64", na_value=np.nan)
+            column_hashes[col] = pd.util.hash_array(numbers)
+        elif values.dtype == object:
+            text = pa.array(values.astype(str).where(values.notna()), type=pa.string())
+            is_number = pc.fill_null(pc.match_substring_regex(text, NUMBER_PATTERN), False)
+            numbers = pc.cast(pc.if_else(is_number, text, None), pa.float64())
+            hashes = pd.util.hash_array(numbers.to_numpy(zero_copy_only=False))
+            is_text = pc.and_(pc.invert(is_number), pc.is_valid(text)).to_numpy(
+                zero_copy_only=False
+            )
+            hashes[is_text] = pd.util.hash_array(values[is_text].astype(str).to_numpy(object))
+            column_hashes[col] = hashes
+        else:
+            # Pinned or parsed dtypes (string, datetime, ...) are the same in every chunk
+            column_hashes[col] = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame(column_hashes), index=False).to_numpy()
+
+
+def stream_process(
+    raw_path: pathlib.Path,
+    filename: str,
+    clean_fn: Callable[[pd.DataFrame], pd.DataFrame],
+    read_kwargs: Dict[str, Any] | None = None,
+    chunksize: int = CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """Clean a large CSV chunk by chunk, appending each cleaned chunk to the prepared file.
+
+    Only one chunk of rows is held at a time. The cleaning functions are
+    row-local except for duplicate removal, so rows already seen in an earlier
+    chunk are dropped by hash (stable_row_hashes) before cleaning. The hashes
+    of kept rows live in a sorted uint64 array (8 bytes per row): each chunk is
+    looked up with np.searchsorted and merged in with one stable sort of two
+    sorted runs.
+
+    Yields:
+        pd.DataFrame: Each cleaned chunk, after it has been written.
+    """
+    PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    save_path = PREPARED_DATA_DIR.joinpath(filename)
+    logger.info(f"Streaming raw data from {raw_path} in chunks of {chunksize} rows.")
+
+    seen = np.empty(0, dtype=np.uint64)  # sorted hashes of the rows kept so far
+    first = True
+    # The pyarrow engine cannot iterate in chunks, so streaming uses the C parser
+    with pd.read_csv(raw_path, chunksize=chunksize, **(read_kwargs or {})) as reader:
+        for chunk in reader:
+            hashes = stable_row_hashes(chunk)
+            pos = np.searchsorted(seen, hashes)
+            in_seen = pos < len(seen)
+            in_seen[in_seen] = seen[pos[in_seen]] == hashes[in_seen]
+            keep = ~pd.Series(hashes).duplicated().to_numpy() & ~in_seen
+            # Both parts are sorted, so the stable sort is a linear merge
+            seen = np.sort(np.concatenate([seen, np.sort(hashes[keep])]), kind="stable")
+
+            cleaned = clean_fn(to_arrow_strings(chunk[keep]))
+            write_prepared_data(cleaned, save_path, append=not first)
+            first = False
+            yield cleaned
+
+    logger.info(f"Successfully streamed prepared data to {save_path.name}")
+
+
 def clean_customer_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     """Apply cleaning logic specific to the customer data."""
     if df_raw.empty:
@@ -84,14 +273,17 @@ def clean_customer_data(df_raw: pd.DataFrame) -> pd.DataFrame:
 
     # Step 1: Remove duplicates
     scrubber.remove_duplicate_records()
+    scrubber.df = coerce_numeric_columns(scrubber.df, CUSTOMER_NUMERIC_COLUMNS)
 
     # Step 2: Handle missing values
     # Fill missing strings with 'N/A' (Not Available)
     scrubber.handle_missing_data(fill_value='N/A')
 
     # Step 3: Normalize strings (lowercase and trim whitespace)
-    for col in ['Name', 'Region', 'PreferredContactMethod']:
-        scrubber.format_column_strings_to_lower_and_trim(col)
+    scrubber.format_column_strings_to_lower_and_trim('Name')
+    # Low-cardinality columns are normalized once per category, not once per row
+    for col in ['Region', 'PreferredContactMethod']:
+        scrubber.format_categorical_column_strings(col)
 
     # Step 4: Convert types (dates and numeric)
     # FIX: Use direct pd.to_datetime with errors='coerce' to handle bad date strings (like month 13)
@@ -114,6 +306,7 @@ def clean_product_data(df_raw: pd.DataFrame) -> pd.DataFrame:
 
     # Step 1: Remove duplicates
     scrubber.remove_duplicate_records()
+    scrubber.df = coerce_numeric_columns(scrubber.df, PRODUCT_NUMERIC_COLUMNS)
 
     # Step 2: Handle missing values
     # For missing prices and quantities, we replace them with 0
@@ -124,8 +317,9 @@ def clean_product_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     scrubber.handle_missing_data(fill_value='N/A')
 
     # Step 3: Normalize strings
-    for col in ['ProductName', 'Category', 'SupplierName']:
-        scrubber.format_column_strings_to_lower_and_trim(col)
+    scrubber.format_column_strings_to_lower_and_trim('ProductName')
+    for col in ['Category', 'SupplierName']:
+        scrubber.format_categorical_column_strings(col)
 
     # Step 4: Convert types
     for col, dtype in PRODUCT_TYPE_MAPPING.items():
@@ -146,13 +340,13 @@ def clean_sales_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     # Step 1: Remove duplicates
     scrubber.remove_duplicate_records()
 
-    # --- FIX for ValueError: 'could not convert string to float: '?' ---
-    # We must explicitly replace any non-numeric garbage in the float columns with NaN
-    # before we attempt the float conversion. This handles '?' or other bad strings.
-    numeric_cols_to_clean = ['SaleAmount', 'DiscountPercent']
-    for col in numeric_cols_to_clean:
-        # Use regex to replace anything that is NOT a number, dot, or minus sign with NaN
-        scrubber.df[col] = scrubber.df[col].replace(r'[^0-9\.\-]', pd.NA, regex=True)
+    # Garbage numbers (e.g. '$321.87') become NaN, so those rows are dropped below.
+    # DiscountPercent is raw text such as '6%': drop the percent sign, then
+    # coerce in one vectorized pass so any remaining garbage becomes NaN.
+    scrubber.df = coerce_numeric_columns(scrubber.df, SALES_NUMERIC_COLUMNS)
+    scrubber.df['DiscountPercent'] = pd.to_numeric(
+        scrubber.df['DiscountPercent'].astype('string').str.rstrip('%'), errors='coerce'
+    )
 
     # Step 2: Handle missing values
     # Drop rows where SaleAmount is missing (critical data)
@@ -160,10 +354,12 @@ def clean_sales_data(df_raw: pd.DataFrame) -> pd.DataFrame:
     # Fill the rest with 0 for numerics and 'N/A' for strings
     # This step now works safely because garbage strings were converted to NaN above.
     scrubber.df['DiscountPercent'] = scrubber.df['DiscountPercent'].fillna(0.0)
-    scrubber.df['CampaignID'] = scrubber.df['CampaignID'].fillna('N/A')
+    # A streamed chunk with no missing IDs parses as int64; keep float64 so every
+    # chunk writes 3.0 like the whole file does
+    scrubber.df['CampaignID'] = scrubber.df['CampaignID'].astype('float64').fillna('N/A')
 
     # Step 3: Normalize strings
-    scrubber.format_column_strings_to_lower_and_trim('PaymentType')
+    scrubber.format_categorical_column_strings('PaymentType')
 
     # Step 4: Convert types
     # FIX: Use direct pd.to_datetime with errors='coerce' to handle bad date strings (like month 13)
@@ -179,29 +375,132 @@ def clean_sales_data(df_raw: pd.DataFrame) -> pd.DataFrame:
 # --- Main Pipeline Function ---
 
 
-def main() -> None:
-    """Process raw data using the DataScrubber and save the prepared data."""
+def _lazy_clean_customer_data(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy Polars version of clean_customer_data."""
+    return (
+        lf.unique(keep='first', maintain_order=True)
+        .with_columns(pl.col(pl.String).fill_null('N/A'))
+        .with_columns(
+            pl.col('Name', 'Region', 'PreferredContactMethod').str.strip_chars().str.to_lowercase(),
+            pl.col('JoinDate').str.to_date('%m/%d/%Y', strict=False),
+        )
+    )
+
+
+def _lazy_clean_product_data(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy Polars version of clean_product_data."""
+    return (
+        lf.unique(keep='first', maintain_order=True)
+        .with_columns(pl.col('UnitPrice').fill_null(0.0), pl.col('StockQuantity').fill_null(0))
+        .with_columns(pl.col(pl.String).fill_null('N/A'))
+        .with_columns(
+            pl.col('ProductName', 'Category', 'SupplierName').str.strip_chars().str.to_lowercase()
+        )
+    )
+
+
+def _lazy_clean_sales_data(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Lazy Polars version of clean_sales_data."""
+    return (
+        lf.unique(keep='first', maintain_order=True)
+        .filter(pl.col('SaleAmount').is_not_null())
+        .with_columns(
+            pl.col('DiscountPercent')
+            .str.strip_chars_end('%')
+            .cast(pl.Float64, strict=False)
+            .fill_null(0.0),
+            pl.col('CampaignID').cast(pl.String).fill_null('N/A'),
+            pl.col('PaymentType').str.strip_chars().str.to_lowercase(),
+            pl.col('SaleDate').str.to_date('%m/%d/%Y', strict=False),
+        )
+    )
+
+
+# Lazy cleaner and schema overrides for each raw file, used by the Polars backend
+LAZY_PIPELINES: Dict[str, Tuple[Callable[[pl.LazyFrame], pl.LazyFrame], Dict[str, Any]]] = {
+    "customers_data.csv": (_lazy_clean_customer_data, CUSTOMER_SCHEMA),
+    "products_data.csv": (_lazy_clean_product_data, PRODUCT_SCHEMA),
+    "sales_data.csv": (_lazy_clean_sales_data, SALES_SCHEMA),
+}
+
+
+def stream_process_polars(raw_filename: str, prepared_filename: str) -> None:
+    """Clean one raw file as a lazy Polars query streamed from CSV to CSV.
+
+    Nothing is materialized in between, so files larger than memory work too.
+    """
+    lazy_clean, schema = LAZY_PIPELINES[raw_filename]
+    PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    run_lazy_pipeline(
+        RAW_DATA_DIR.joinpath(raw_filename),
+        PREPARED_DATA_DIR.joinpath(prepared_filename),
+        lazy_clean,
+        NA_VALUES,
+        schema_overrides=schema,
+    )
+
+
+def process_one(
+    job: Tuple[str, str, Callable[[pd.DataFrame], pd.DataFrame], Dict[str, Any]],
+    polars_backend: bool = False,
+) -> None:
+    """Read, clean and save one raw file.
+
+    Kept at module level so it can be pickled and sent to a worker process.
+    """
+    raw_filename, prepared_filename, clean_function, read_kwargs = job
+    raw_path = RAW_DATA_DIR.joinpath(raw_filename)
+
+    if polars_backend:
+        stream_process_polars(raw_filename, prepared_filename)
+        return
+
+    # Large files: read, clean and save one chunk at a time
+    if raw_path.exists() and raw_path.stat().st_size > STREAM_THRESHOLD_BYTES:
+        chunks = stream_process(raw_path, prepared_filename, clean_function, read_kwargs)
+        rows = sum(len(chunk) for chunk in chunks)
+        logger.info(f"{raw_filename}: streamed {rows} cleaned rows")
+        return
+
+    # 1. Read
+    df_raw = read_data(raw_path, read_kwargs)
+
+    if not df_raw.empty:
+        # 2. Clean
+        df_cleaned = clean_function(df_raw)
+
+        # 3. Save
+        save_prepared_data(df_cleaned, prepared_filename)
+
+
+def main(polars_backend: bool = False) -> None:
+    """Process raw data using the DataScrubber and save the prepared data.
+
+    Args:
+        polars_backend (bool): If True, clean each file with its lazy Polars
+            query (scan_csv -> clean -> sink_csv) instead of the pandas steps.
+    """
     logger.info("Starting comprehensive data preparation using DataScrubber...")
 
     # Define paths and file names
     files_to_process = [
-        ("customers_data.csv", "customers_prepared.csv", clean_customer_data),
-        ("products_data.csv", "products_prepared.csv", clean_product_data),
-        ("sales_data.csv", "sales_prepared.csv", clean_sales_data),
+        ("customers_data.csv", "customers_prepared.csv", clean_customer_data, CUSTOMER_READ),
+        ("products_data.csv", "products_prepared.csv", clean_product_data, PRODUCT_READ),
+        ("sales_data.csv", "sales_prepared.csv", clean_sales_data, SALES_READ),
     ]
 
-    for raw_filename, prepared_filename, clean_function in files_to_process:
-        raw_path = RAW_DATA_DIR.joinpath(raw_filename)
-
-        # 1. Read
-        df_raw = read_data(raw_path)
-
-        if not df_raw.empty:
-            # 2. Clean
-            df_cleaned = clean_function(df_raw)
-
-            # 3. Save
-            save_prepared_data(df_cleaned, prepared_filename)
+    # The files are independent, so large inputs are prepared one per process.
+    # Workers configure the logger themselves (spawned processes start without it).
+    run_one = partial(process_one, polars_backend=polars_backend)
+    raw_paths = [RAW_DATA_DIR.joinpath(raw_filename) for raw_filename, *_ in files_to_process]
+    total_bytes = sum(path.stat().st_size for path in raw_paths if path.exists())
+    if total_bytes < PARALLEL_THRESHOLD_BYTES:
+        for job in files_to_process:
+            run_one(job)
+    else:
+        max_workers = min(len(files_to_process), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_logger) as executor:
+            list(executor.map(run_one, files_to_process))
 
     logger.info("All data preparation complete. Files are ready in data/prepared.")
 
@@ -210,4 +509,4 @@ if __name__ == "__main__":
     # Initialize logger
     init_logger()
     # Call the main function
-    main()
+    main(polars_backend="--polars" in sys.argv[1:])
@@ -21,7 +21,9 @@ import pathlib
 import sys
 
 # Import from external packages (requires a virtual environment)
+import numpy as np
 import pandas as pd
+import polars as pl
 
 # Ensure project root is in sys.path for local imports (now 3 parents are needed)
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
@@ -32,6 +34,12 @@ from utils.logger import logger
 # Optional: Use a data_scrubber module for common data cleaning tasks
 from utils.data_scrubber import DataScrubber
 
+# Arrow-based CSV/Parquet writer for the prepared output
+from utils.data_writer import write_prepared_data
+
+# Shared pieces of the --polars backend
+from utils.polars_pipeline import most_common, run_lazy_pipeline
+
 
 # Constants
 SCRIPTS_DATA_PREP_DIR: pathlib.Path = (
@@ -44,6 +52,9 @@ DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
 RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
 
+# Placeholder strings the CSV parser should read as missing values
+NA_VALUES: list[str] = ["NULL", "null", "", "NaN"]
+
 
 # Ensure the directories exist or create them
 DATA_DIR.mkdir(exist_ok=True)
@@ -60,7 +71,7 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     file_path: pathlib.Path = RAW_DATA_DIR.joinpath(file_name)
     try:
         logger.info(f"READING: {file_path}.")
-        return pd.read_csv(file_path)
+        return pd.read_csv(file_path, engine="pyarrow", na_values=NA_VALUES)
     except FileNotFoundError:
         logger.error(f"File not found: {file_path}")
         return pd.DataFrame()  # Return an empty DataFrame if the file is not found
@@ -71,7 +82,7 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
 
 def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
     """
-    Save cleaned data to CSV.
+    Save cleaned data to CSV, or to Parquet if file_name ends in .parquet.
 
     Args:
         df (pd.DataFrame): Cleaned DataFrame.
@@ -81,7 +92,7 @@ def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
         f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
     )
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
+    write_prepared_data(df, file_path)
     logger.info(f"Data saved to {file_path}")
 
 
@@ -131,17 +142,24 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(f"Total missing values before handling: {missing_before}")
 
     # Fill missing PreferredContactMethod with the most common method (mode)
-    most_common_contact = df['PreferredContactMethod'].mode()[0]
-    df['PreferredContactMethod'].fillna(most_common_contact, inplace=True)
+    # value_counts is one hash pass; ties resolve to the first sorted value, like .mode()
+    most_common_contact = (
+        df['PreferredContactMethod'].value_counts(sort=False).sort_index().idxmax()
+    )
 
     # Ensure no missing CustomerID (drop if exists, because it's a key)
-    df.dropna(subset=['CustomerID'], inplace=True)
-
-    # Fill missing Region with 'Unknown'
-    df['Region'].fillna('Unknown', inplace=True)
-
-    # Fill missing LoyaltyPoints with median (more robust to outliers)
-    df['LoyaltyPoints'].fillna(df['LoyaltyPoints'].median(), inplace=True)
+    df = df.dropna(subset=['CustomerID'])
+
+    # Fill every column in one pass:
+    # - Region with 'Unknown'
+    # - LoyaltyPoints with median (more robust to outliers)
+    df = df.fillna(
+        {
+            'PreferredContactMethod': most_common_contact,
+            'Region': 'Unknown',
+            'LoyaltyPoints': df['LoyaltyPoints'].median(),
+        }
+    )
 
     # Log missing values count after handling
     missing_after = df.isna().sum().sum()
@@ -169,16 +187,19 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     # Convert columns to numeric and drop rows with invalid entries
     df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
     df = df.dropna(subset=numeric_cols)
+    # Build one boolean mask for every filter and slice the frame once.
+    # Each column's IQR is taken over the rows kept by the filters before it.
+    mask = np.ones(len(df), dtype=bool)
     # Use Interquartile Range (IQR) method to remove outliers
     for col in numeric_cols:
-        q1 = df[col].quantile(0.25)
-        q3 = df[col].quantile(0.75)
+        q1, q3 = df[col][mask].quantile([0.25, 0.75])
         iqr = q3 - q1
         lower = q1 - 1.5 * iqr
         upper = q3 + 1.5 * iqr
-        df = df[(df[col] >= lower) & (df[col] <= upper)]
+        mask &= df[col].between(lower, upper).to_numpy(dtype=bool, na_value=False)
     # Enforce reasonable business limits for LoyaltyPoints
-    df = df[(df['LoyaltyPoints'] >= 0) & (df['LoyaltyPoints'] <= 1000)]
+    mask &= df['LoyaltyPoints'].between(0, 1000).to_numpy(dtype=bool, na_value=False)
+    df = df[mask]
 
     removed_count = initial_count - len(df)
     logger.info(f"Removed {removed_count} outlier rows")
@@ -186,14 +207,56 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _lazy_clean_customers(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Build the customer cleaning steps as one lazy Polars query.
+
+    LoyaltyPoints stay whole numbers (Int64) so the prepared CSV matches the
+    pandas output; a missing value is filled with the rounded median.
+
+    Args:
+        lf (pl.LazyFrame): Raw customer data as scanned from CSV.
+
+    Returns:
+        pl.LazyFrame: Lazy query producing the prepared customer data.
+    """
+    points = pl.col('LoyaltyPoints')
+    q1 = points.quantile(0.25, interpolation='linear')
+    q3 = points.quantile(0.75, interpolation='linear')
+    iqr = q3 - q1
+    most_common_contact = most_common('PreferredContactMethod')
+
+    return (
+        # Clean column names
+        lf.rename(lambda c: c.strip())
+        # Remove duplicates
+        .unique(keep='first', maintain_order=True)
+        # Handle missing values
+        .drop_nulls(subset=['CustomerID'])
+        .with_columns(
+            pl.col('PreferredContactMethod').fill_null(most_common_contact),
+            pl.col('Region').fill_null('Unknown'),
+            points.cast(pl.Int64, strict=False),
+        )
+        .with_columns(points.fill_null(points.median().round().cast(pl.Int64)))
+        # Remove outliers (IQR, then business limits)
+        .filter(points.is_between(q1 - 1.5 * iqr, q3 + 1.5 * iqr))
+        .filter(points.is_between(0, 1000))
+    )
+
+
 #####################################
 # Define Main Function - The main entry point of the script
 #####################################
 
 
-def main() -> None:
+def main(polars_backend: bool = False) -> None:
     """
     Main function for processing customer data.
+
+    Args:
+        polars_backend (bool): If True, run the lazy Polars pipeline
+            (scan_csv -> clean -> sink_csv) instead of the pandas steps.
     """
     logger.info("==================================")
     logger.info("STARTING prepare_customers_data.py")
@@ -207,6 +270,16 @@ def main() -> None:
     input_file = "customers_data.csv"
     output_file = "customers_prepared.csv"
 
+    if polars_backend:
+        run_lazy_pipeline(
+            RAW_DATA_DIR.joinpath(input_file),
+            PREPARED_DATA_DIR.joinpath(output_file),
+            _lazy_clean_customers,
+            NA_VALUES,
+        )
+        logger.info("FINISHED prepare_customers_data.py (polars backend)")
+        return
+
     # Read raw data
     df = read_raw_data(input_file)
 
@@ -255,4 +328,4 @@ def main() -> None:
 #####################################
 
 if __name__ == "__main__":
-    main()
+    main(polars_backend="--polars" in sys.argv[1:])
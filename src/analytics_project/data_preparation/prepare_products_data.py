@@ -17,11 +17,14 @@ Tasks:
 #####################################
 
 # Import from Python Standard Library
+import os
 import pathlib
 import sys
 
 # Import from external packages (requires a virtual environment)
+import numpy as np
 import pandas as pd
+import polars as pl
 
 # Ensure project root is in sys.path for local imports (now 3 parents are needed)
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
@@ -32,6 +35,12 @@ from utils.logger import logger
 # Optional: Use a data_scrubber module for common data cleaning tasks
 from utils.data_scrubber import DataScrubber
 
+# Arrow-based CSV/Parquet writer for the prepared output
+from utils.data_writer import write_prepared_data
+
+# Shared pieces of the --polars backend
+from utils.polars_pipeline import most_common, run_lazy_pipeline, within_iqr
+
 
 # Constants
 SCRIPTS_DATA_PREP_DIR: pathlib.Path = (
@@ -44,6 +53,13 @@ DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
 RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
 
+# Placeholder strings the CSV parser should read as missing values
+NA_VALUES: list[str] = ["NULL", "null", "", "NaN"]
+
+# Set PROFILE_DATASET=1 to log per-column unique counts and missing percentages
+# (a full pass over every column, so it is off by default)
+PROFILE_DATASET: bool = bool(os.environ.get("PROFILE_DATASET"))
+
 
 # Ensure the directories exist or create them
 DATA_DIR.mkdir(exist_ok=True)
@@ -68,20 +84,22 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     logger.info(f"FUNCTION START: read_raw_data with file_name={file_name}")
     file_path = RAW_DATA_DIR.joinpath(file_name)
     logger.info(f"Reading data from {file_path}")
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(file_path, engine="pyarrow", na_values=NA_VALUES)
     logger.info(f"Loaded dataframe with {len(df)} rows and {len(df.columns)} columns")
 
     # OPTIONAL: basic profiling to understand the dataset
     logger.info(f"Column dtypes:\n{df.dtypes}")
-    logger.info(f"Unique values per column:\n{df.nunique()}")
-    missing_pct = (df.isna().mean() * 100).round(2)
-    logger.info(f"Missing values (%):\n{missing_pct}")
+    if PROFILE_DATASET:
+        # Lazy arguments are only computed if a handler will emit the message
+        log = logger.opt(lazy=True)
+        log.info("Unique values per column:\n{}", lambda: df.nunique())
+        log.info("Missing values (%):\n{}", lambda: (df.isna().mean() * 100).round(2))
     return df
 
 
 def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
     """
-    Save cleaned data to CSV.
+    Save cleaned data to CSV, or to Parquet if file_name ends in .parquet.
 
     Args:
         df (pd.DataFrame): Cleaned DataFrame.
@@ -91,33 +109,10 @@ def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
         f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
     )
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
+    write_prepared_data(df, file_path)
     logger.info(f"Data saved to {file_path}")
 
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Remove duplicate rows from the DataFrame.
-
-    Args:
-        df (pd.DataFrame): Input DataFrame.
-
-    Returns:
-        pd.DataFrame: DataFrame with duplicates removed.
-    """
-    logger.info(f"FUNCTION START: remove_duplicates with dataframe shape={df.shape}")
-    initial_count = len(df)
-
-    df = df.drop_duplicates(subset=['productid'])
-
-    df = df.drop_duplicates()
-
-    removed_count = initial_count - len(df)
-    logger.info(f"Removed {removed_count} duplicate rows")
-    logger.info(f"{len(df)} records remaining after removing duplicates.")
-    return df
-
-
 def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     Handle missing values by filling or dropping.
@@ -137,35 +132,38 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(f"Missing values by column before handling:\n{missing_by_col}")
 
     # Handle missing values appropriately for the products dataset
-
-    # Replace placeholder strings with real NaN values
-    df.replace({"NULL": pd.NA, "null": pd.NA, "": pd.NA, "NaN": pd.NA}, inplace=True)
+    # (placeholder strings were already read as NaN, see NA_VALUES)
 
     # Drop rows missing the key identifier
-    if 'ProductID' in df.columns:
-        df.dropna(subset=['ProductID'], inplace=True)
+    if 'productid' in df.columns:
+        df = df.dropna(subset=['productid'])
+
+    # Collect a fill value per column, then fill them all in a single pass
+    fill_values = {}
 
     # Fill missing text columns with defaults or most frequent values
-    if 'ProductName' in df.columns:
-        df['ProductName'].fillna('Unknown Product', inplace=True)
+    if 'productname' in df.columns:
+        fill_values['productname'] = 'Unknown Product'
 
-    if 'Category' in df.columns:
-        mode_category = (
-            df['Category'].mode().iloc[0] if not df['Category'].mode().empty else 'uncategorized'
+    # Most frequent values come from one value_counts hash pass per column;
+    # ties resolve to the first value in sorted order, as with .mode()
+    if 'category' in df.columns:
+        category_counts = df['category'].value_counts(sort=False)
+        fill_values['category'] = (
+            category_counts.sort_index().idxmax() if not category_counts.empty else 'uncategorized'
         )
-        df['Category'].fillna(mode_category, inplace=True)
 
-    if 'SupplierName' in df.columns:
-        mode_supplier = (
-            df['SupplierName'].mode().iloc[0] if not df['SupplierName'].mode().empty else 'unknown'
+    if 'suppliername' in df.columns:
+        supplier_counts = df['suppliername'].value_counts(sort=False)
+        fill_values['suppliername'] = (
+            supplier_counts.sort_index().idxmax() if not supplier_counts.empty else 'unknown'
         )
-        df['SupplierName'].fillna(mode_supplier, inplace=True)
 
     # Fill numeric columns with median values to maintain reasonable distribution
-    for col in ['UnitPrice', 'StockQuantity']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            df[col].fillna(df[col].median(), inplace=True)
+    numeric_cols = [c for c in ['unitprice', 'stockquantity'] if c in df.columns]
+    fill_values.update(df[numeric_cols].median().to_dict())
+
+    df = df.fillna(fill_values)
 
     # Log missing values by column after handling
     missing_after = df.isna().sum()
@@ -191,26 +189,29 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     # Identify numeric columns to check
     numeric_cols = [c for c in ['unitprice', 'stockquantity'] if c in df.columns]
 
-    # Coerce to numeric and drop rows that cannot be converted
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Drop rows whose values could not be converted to numbers (see main)
     df = df.dropna(subset=numeric_cols)
 
+    # Build one boolean mask for every filter and slice the frame once.
+    # Each column's IQR is taken over the rows kept by the filters before it.
+    mask = np.ones(len(df), dtype=bool)
+
     # IQR filter per column
     for col in numeric_cols:
-        q1 = df[col].quantile(0.25)
-        q3 = df[col].quantile(0.75)
+        q1, q3 = df[col][mask].quantile([0.25, 0.75])
         iqr = q3 - q1
         lower = q1 - 1.5 * iqr
         upper = q3 + 1.5 * iqr
-        df = df[(df[col] >= lower) & (df[col] <= upper)]
+        mask &= df[col].between(lower, upper).to_numpy(dtype=bool, na_value=False)
         logger.info(f"Applied IQR outlier removal to {col}: bounds [{lower}, {upper}]")
 
     # Business limits (adjust if your data requires)
-    if 'unitprice' in df.columns:
-        df = df[(df['unitprice'] >= 0) & (df['unitprice'] <= 2000)]
-    if 'stockquantity' in df.columns:
-        df = df[(df['stockquantity'] >= 0) & (df['stockquantity'] <= 1000)]
+    business_limits = {'unitprice': (0, 2000), 'stockquantity': (0, 1000)}
+    for col, (lower, upper) in business_limits.items():
+        if col in df.columns:
+            mask &= df[col].between(lower, upper).to_numpy(dtype=bool, na_value=False)
+
+    df = df[mask]
 
     removed_count = initial_count - len(df)
     logger.info(f"Removed {removed_count} outlier rows")
@@ -230,28 +231,32 @@ def standardize_formats(df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info(f"FUNCTION START: standardize_formats with dataframe shape={df.shape}")
 
-    # Trim whitespace in all string columns
+    # Low-cardinality columns: trim and case each distinct value once via the category dtype
+    scrubber = DataScrubber(df)
+    categorical_cases = {'category': 'lower', 'suppliername': 'title'}
+    for c, case in categorical_cases.items():
+        if c in df.columns:
+            scrubber.format_categorical_column_strings(c, case=case)
+    df = scrubber.df
+
+    # Trim whitespace in the remaining string columns (missing values stay missing)
     str_cols = df.select_dtypes(include='object').columns.tolist()
     for c in str_cols:
-        df[c] = df[c].astype(str).str.strip()
+        df[c] = df[c].str.strip()
 
     # Consistent casing
     if 'productname' in df.columns:
         df['productname'] = df['productname'].str.title()
-    if 'category' in df.columns:
-        df['category'] = df['category'].str.lower()
-    if 'suppliername' in df.columns:
-        df['suppliername'] = df['suppliername'].str.title()
 
     # Numeric formatting
     if 'unitprice' in df.columns:
-        df['unitprice'] = pd.to_numeric(df['unitprice'], errors='coerce').round(2)
+        df['unitprice'] = df['unitprice'].round(2)
     if 'stockquantity' in df.columns:
-        df['stockquantity'] = pd.to_numeric(df['stockquantity'], errors='coerce').astype('Int64')
+        df['stockquantity'] = df['stockquantity'].astype('Int64')
 
     # Ensure productid is integer-like when possible
     if 'productid' in df.columns:
-        df['productid'] = pd.to_numeric(df['productid'], errors='coerce').astype('Int64')
+        df['productid'] = df['productid'].astype('Int64')
 
     logger.info("Completed standardizing formats")
     return df
@@ -269,34 +274,94 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info(f"FUNCTION START: validate_data with dataframe shape={df.shape}")
 
-    # productid must be present, positive, and unique
-    if 'productid' in df.columns:
-        before = len(df)
-        df = df.dropna(subset=['productid'])
-        df = df[df['productid'] > 0]
-        df = df.drop_duplicates(subset=['productid'])
-        logger.info(f"Validated productid: removed {before - len(df)} invalid/duplicate rows")
-
+    # Every rule goes into one boolean mask so the frame is sliced once:
+    # productid must be positive (missing ids fail the comparison too),
     # unitprice and stockquantity must be non-negative
-    if 'unitprice' in df.columns:
-        bad = (df['unitprice'] < 0).sum()
-        if bad:
-            logger.info(f"Found {bad} rows with negative unitprice; removing")
-        df = df[df['unitprice'] >= 0]
-
-    if 'stockquantity' in df.columns:
-        bad = (df['stockquantity'] < 0).sum()
-        if bad:
-            logger.info(f"Found {bad} rows with negative stockquantity; removing")
-        df = df[df['stockquantity'] >= 0]
+    mask = np.ones(len(df), dtype=bool)
+    rules = {
+        'productid': lambda s: s > 0,
+        'unitprice': lambda s: s >= 0,
+        'stockquantity': lambda s: s >= 0,
+    }
+    for col, rule in rules.items():
+        if col in df.columns:
+            valid = rule(df[col]).to_numpy(dtype=bool, na_value=False)
+            bad = len(valid) - valid.sum()
+            if bad:
+                logger.info(f"Found {bad} rows with invalid {col}; removing")
+            mask &= valid
+
+    # Rows sharing a productid are duplicates; keep the first valid occurrence
+    before = len(df)
+    df = df[mask]
+    if 'productid' in df.columns:
+        df = df.drop_duplicates(subset=['productid'], keep='first', ignore_index=True)
+    logger.info(f"Validated data: removed {before - len(df)} invalid or duplicate rows")
 
     logger.info("Data validation complete")
     return df
 
 
-def main() -> None:
+def _lazy_clean_products(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Build the product cleaning steps as one lazy Polars query.
+
+    Applies the rules of handle_missing_values, remove_outliers, validate_data
+    and standardize_formats, in that order.
+
+    Args:
+        lf (pl.LazyFrame): Raw product data as scanned from CSV.
+
+    Returns:
+        pl.LazyFrame: Lazy query producing the prepared product data.
+    """
+    numeric_cols = ['unitprice', 'stockquantity']
+
+    return (
+        # Clean column names
+        lf.rename(lambda c: c.strip().lower().replace(' ', '_'))
+        # Handle missing values
+        .drop_nulls(subset=['productid'])
+        .with_columns(
+            pl.col(numeric_cols).cast(pl.Float64, strict=False),
+            pl.col('productname').fill_null('Unknown Product'),
+            pl.col('category').fill_null(most_common('category')).fill_null('uncategorized'),
+            pl.col('suppliername').fill_null(most_common('suppliername')).fill_null('unknown'),
+        )
+        .with_columns(pl.col(numeric_cols).fill_null(pl.col(numeric_cols).median()))
+        # Remove outliers (IQR per column, then business limits)
+        .filter(within_iqr('unitprice'))
+        .filter(within_iqr('stockquantity'))
+        .filter(
+            pl.col('unitprice').is_between(0, 2000) & pl.col('stockquantity').is_between(0, 1000)
+        )
+        # Validate data and remove duplicate productids
+        .filter(
+            (pl.col('productid') > 0)
+            & (pl.col('unitprice') >= 0)
+            & (pl.col('stockquantity') >= 0)
+        )
+        .unique(subset=['productid'], keep='first', maintain_order=True)
+        # Standardize formats
+        .with_columns(pl.col(pl.String).str.strip_chars())
+        .with_columns(
+            pl.col('productname').str.to_titlecase(),
+            pl.col('category').str.to_lowercase(),
+            pl.col('suppliername').str.to_titlecase(),
+            pl.col('unitprice').round(2),
+            pl.col('stockquantity').cast(pl.Int64),
+            pl.col('productid').cast(pl.Int64),
+        )
+    )
+
+
+def main(polars_backend: bool = False) -> None:
     """
     Main function for processing product data.
+
+    Args:
+        polars_backend (bool): If True, run the lazy Polars pipeline
+            (scan_csv -> clean -> sink_csv) instead of the pandas steps.
     """
     logger.info("==================================")
     logger.info("STARTING prepare_products_data.py")
@@ -310,17 +375,21 @@ def main() -> None:
     input_file = "products_data.csv"
     output_file = "products_prepared.csv"
 
-    # Read raw data
-    df = read_raw_data(input_file)
+    if polars_backend:
+        run_lazy_pipeline(
+            RAW_DATA_DIR.joinpath(input_file),
+            PREPARED_DATA_DIR.joinpath(output_file),
+            _lazy_clean_products,
+            NA_VALUES,
+        )
+        logger.info("FINISHED prepare_products_data.py (polars backend)")
+        return
 
-    # Read raw data
+    # Read raw data (column names and dtypes are logged by read_raw_data)
     df = read_raw_data(input_file)
 
     # Record original shape
     original_shape = df.shape
-
-    # Log initial dataframe information
-    logger.info(f"Initial dataframe columns: {', '.join(df.columns.tolist())}")
     logger.info(f"Initial dataframe shape: {df.shape}")
 
     # Clean column names
@@ -334,8 +403,10 @@ def main() -> None:
     if changed_columns:
         logger.info(f"Cleaned column names: {', '.join(changed_columns)}")
 
-    # Remove duplicates
-    df = remove_duplicates(df)
+    # Coerce numeric columns once; the cleaning steps below rely on these dtypes
+    for col in ['productid', 'unitprice', 'stockquantity']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
 
     # Handle missing values
     df = handle_missing_values(df)
@@ -343,7 +414,7 @@ def main() -> None:
     # Remove outliers
     df = remove_outliers(df)
 
-    # Validate data
+    # Validate data and remove duplicate productids
     df = validate_data(df)
 
     # Standardize formats
@@ -365,4 +436,4 @@ def main() -> None:
 # -------------------
 
 if __name__ == "__main__":
-    main()
+    main(polars_backend="--polars" in sys.argv[1:])
@@ -17,11 +17,14 @@ Tasks:
 #####################################
 
 # Import from Python Standard Library
+import os
 import pathlib
 import sys
 
 # Import from external packages (requires a virtual environment)
+import numpy as np
 import pandas as pd
+import polars as pl
 
 # Ensure project root is in sys.path for local imports (now 3 parents are needed)
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
@@ -32,6 +35,12 @@ from utils.logger import logger
 # Optional: Use a data_scrubber module for common data cleaning tasks
 from utils.data_scrubber import DataScrubber
 
+# Arrow-based CSV/Parquet writer for the prepared output
+from utils.data_writer import write_prepared_data
+
+# Shared pieces of the --polars backend
+from utils.polars_pipeline import most_common, run_lazy_pipeline, within_iqr
+
 
 # Constants
 SCRIPTS_DATA_PREP_DIR: pathlib.Path = (
@@ -44,6 +53,13 @@ DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
 RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"  # place to store prepared data
 
+# Placeholder strings the CSV parser should read as missing values
+NA_VALUES: list[str] = ["NULL", "null", "", "NaN"]
+
+# Set PROFILE_DATASET=1 to log per-column unique counts and missing percentages
+# (a full pass over every column, so it is off by default)
+PROFILE_DATASET: bool = bool(os.environ.get("PROFILE_DATASET"))
+
 
 # Ensure the directories exist or create them
 DATA_DIR.mkdir(exist_ok=True)
@@ -57,13 +73,13 @@ PREPARED_DATA_DIR.mkdir(exist_ok=True)
 
 def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
     """
-    Save cleaned data to CSV.
+    Save cleaned data to CSV, or to Parquet if file_name ends in .parquet.
     """
     logger.info(
         f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
     )
     file_path = PREPARED_DATA_DIR.joinpath(file_name)
-    df.to_csv(file_path, index=False)
+    write_prepared_data(df, file_path)
     logger.info(f"Data saved to {file_path}")
 
 
@@ -87,13 +103,12 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info(f"FUNCTION START: handle_missing_values with dataframe shape={df.shape}")
 
-    # Normalize common placeholders to NaN
-    df.replace({"NULL": pd.NA, "null": pd.NA, "": pd.NA, "NaN": pd.NA}, inplace=True)
+    # Common placeholders were already read as NaN (see NA_VALUES)
 
     # TransactionID must exist
     if 'TransactionID' in df.columns:
         before = len(df)
-        df.dropna(subset=['TransactionID'], inplace=True)
+        df = df.dropna(subset=['TransactionID'])
         logger.info(f"Dropped {before - len(df)} rows missing TransactionID")
 
     # Parse dates
@@ -104,11 +119,8 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
             logger.info(f"Found {dropped} invalid SaleDate values; dropping those rows")
             df = df.dropna(subset=['SaleDate'])
 
-    # Coerce numeric columns
-    if 'DiscountPercent' in df.columns:
-        df['DiscountPercent'] = pd.to_numeric(
-            df['DiscountPercent'].astype(str).str.replace('%', '', regex=False), errors='coerce'
-        )
+    # Coerce numeric columns, one vectorized pass per column.
+    # DiscountPercent may be written like '6%', so its trailing sign is dropped first.
     for col in [
         'SaleAmount',
         'DiscountPercent',
@@ -118,20 +130,29 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
         'CampaignID',
     ]:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            values = df[col]
+            if col == 'DiscountPercent' and values.dtype == object:
+                values = values.str.rstrip('%')
+            df[col] = pd.to_numeric(values, errors='coerce')
+
+    # Collect a fill value per column, then fill them all in a single pass
+    fill_values = {}
 
     # Fill text columns
     if 'PaymentType' in df.columns:
-        mode_pay = (
-            df['PaymentType'].mode().iloc[0] if not df['PaymentType'].mode().empty else 'Unknown'
+        # One value_counts hash pass; ties resolve to the first value in sorted order like .mode()
+        pay_counts = df['PaymentType'].value_counts(sort=False)
+        fill_values['PaymentType'] = (
+            pay_counts.sort_index().idxmax() if not pay_counts.empty else 'Unknown'
         )
-        df['PaymentType'].fillna(mode_pay, inplace=True)
 
     # Fill numeric columns
     if 'SaleAmount' in df.columns:
-        df['SaleAmount'].fillna(df['SaleAmount'].median(), inplace=True)
+        fill_values['SaleAmount'] = df['SaleAmount'].median()
     if 'DiscountPercent' in df.columns:
-        df['DiscountPercent'].fillna(0, inplace=True)  # assume no discount when missing
+        fill_values['DiscountPercent'] = 0  # assume no discount when missing
+
+    df = df.fillna(fill_values)
 
     logger.info("Missing values handled")
     return df
@@ -144,22 +165,36 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(f"FUNCTION START: remove_outliers with dataframe shape={df.shape}")
     initial = len(df)
 
+    # One boolean mask for every filter, so the frame is sliced a single time.
+    # Each column's IQR is taken over the rows kept by the filters before it.
+    mask = np.ones(len(df), dtype=bool)
+
+    # Work on plain float arrays (missing -> NaN, which fails every comparison)
+    cols = [c for c in ['SaleAmount', 'DiscountPercent'] if c in df.columns]
+    values = {c: df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in cols}
+
     # IQR filter for key numeric columns
-    for col in ['SaleAmount', 'DiscountPercent']:
-        if col in df.columns:
-            q1 = df[col].quantile(0.25)
-            q3 = df[col].quantile(0.75)
-            iqr = q3 - q1
-            lower = q1 - 1.5 * iqr
-            upper = q3 + 1.5 * iqr
-            df = df[(df[col] >= lower) & (df[col] <= upper)]
-            logger.info(f"IQR filter on {col}: kept within [{lower}, {upper}]")
+    for col in cols:
+        kept = values[col][mask]
+        kept = kept[~np.isnan(kept)]
+        if kept.size == 0:
+            mask[:] = False
+            break
+        # Both quartiles in one selection pass
+        q1, q3 = np.quantile(kept, [0.25, 0.75], method='linear')
+        iqr = q3 - q1
+        lower = q1 - 1.5 * iqr
+        upper = q3 + 1.5 * iqr
+        mask &= (values[col] >= lower) & (values[col] <= upper)
+        logger.info(f"IQR filter on {col}: kept within [{lower}, {upper}]")
 
     # Business guardrails
-    if 'SaleAmount' in df.columns:
-        df = df[(df['SaleAmount'] >= 0) & (df['SaleAmount'] <= 10000)]
-    if 'DiscountPercent' in df.columns:
-        df = df[(df['DiscountPercent'] >= 0) & (df['DiscountPercent'] <= 100)]
+    guardrails = {'SaleAmount': (0, 10000), 'DiscountPercent': (0, 100)}
+    for col, (lower, upper) in guardrails.items():
+        if col in values:
+            mask &= (values[col] >= lower) & (values[col] <= upper)
+
+    df = df[mask]
 
     logger.info(f"Removed {initial - len(df)} outlier rows; remaining {len(df)}")
     return df
@@ -178,23 +213,76 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     logger.info(f"FUNCTION START: read_raw_data with file_name={file_name}")
     file_path = RAW_DATA_DIR.joinpath(file_name)
     logger.info(f"Reading data from {file_path}")
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(file_path, engine="pyarrow", na_values=NA_VALUES)
     logger.info(f"Loaded dataframe with {len(df)} rows and {len(df.columns)} columns")
 
     logger.info(f"Column datatypes: \n{df.dtypes}")
-    logger.info(f"Number of unique values: \n{df.nunique()}")
+    if PROFILE_DATASET:
+        # Lazy arguments are only computed if a handler will emit the message
+        logger.opt(lazy=True).info("Number of unique values: \n{}", lambda: df.nunique())
 
     return df
 
 
+def _lazy_clean_sales(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Build the sales cleaning steps as one lazy Polars query.
+
+    Duplicate TransactionIDs and rows without a parseable SaleDate are dropped
+    before filling missing values and filtering outliers like the pandas steps.
+    Column types follow what pandas infers for the raw file, so both backends
+    write the same CSV: CampaignID has missing values (Float64, written 0.0)
+    and DiscountPercent is a whole percent (Int64, written 25).
+    """
+    id_cols = ['CustomerID', 'ProductID', 'StoreID']
+
+    most_common_pay = most_common('PaymentType')
+
+    return (
+        # Clean column names
+        lf.rename(lambda c: c.strip())
+        # Remove duplicates
+        .unique(subset=['TransactionID'], keep='first', maintain_order=True)
+        # Handle missing values and coerce column types
+        .drop_nulls(subset=['TransactionID'])
+        .with_columns(
+            pl.col('SaleDate').cast(pl.String).str.to_date('%m/%d/%Y', strict=False),
+            pl.col('SaleAmount').cast(pl.Float64, strict=False),
+            pl.col('DiscountPercent')
+            .cast(pl.String)
+            .str.strip_chars_end('%')
+            .cast(pl.Float64, strict=False),
+            pl.col(id_cols).cast(pl.Int64, strict=False),
+            pl.col('CampaignID').cast(pl.Float64, strict=False),
+        )
+        .drop_nulls(subset=['SaleDate'])
+        .with_columns(
+            pl.col('PaymentType').fill_null(most_common_pay).fill_null('Unknown'),
+            pl.col('SaleAmount').fill_null(pl.col('SaleAmount').median()),
+            pl.col('DiscountPercent').fill_null(0),
+        )
+        # Remove outliers (IQR per column, then business guardrails)
+        .filter(within_iqr('SaleAmount'))
+        .filter(within_iqr('DiscountPercent'))
+        .filter(
+            pl.col('SaleAmount').is_between(0, 10000) & pl.col('DiscountPercent').is_between(0, 100)
+        )
+        .with_columns(pl.col('DiscountPercent').round().cast(pl.Int64))
+    )
+
+
 #####################################
 # Define Main Function - The main entry point of the script
 #####################################
 
 
-def main() -> None:
+def main(polars_backend: bool = False) -> None:
     """
     Main function for processing data.
+
+    Args:
+        polars_backend (bool): If True, run the lazy Polars pipeline
+            (scan_csv -> clean -> sink_csv) instead of the pandas steps.
     """
     logger.info("==================================")
     logger.info("STARTING prepare_sales_data.py")
@@ -208,6 +296,16 @@ def main() -> None:
     input_file = "sales_data.csv"
     output_file = "sales_prepared.csv"
 
+    if polars_backend:
+        run_lazy_pipeline(
+            RAW_DATA_DIR.joinpath(input_file),
+            PREPARED_DATA_DIR.joinpath(output_file),
+            _lazy_clean_sales,
+            NA_VALUES,
+        )
+        logger.info("FINISHED prepare_sales_data.py (polars backend)")
+        return
+
     # Read raw data
     df = read_raw_data(input_file)
 
@@ -256,4 +354,4 @@ def main() -> None:
 #####################################
 
 if __name__ == "__main__":
-    main()
+    main(polars_backend="--polars" in sys.argv[1:])
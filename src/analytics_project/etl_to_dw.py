@@ -24,10 +24,16 @@ for customers, products, and sales.
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from itertools import chain, islice
 import sqlite3
 from pathlib import Path
+from typing import NamedTuple
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 
 
 # -------------------------------------------------------------------
@@ -45,6 +51,43 @@ DW_DIR.mkdir(parents=True, exist_ok=True)
 
 DB_PATH = DW_DIR / "smart_store_dw.db"
 
+# Connection settings for the batch load. The ETL is the only writer and
+# rebuilds the DW from the prepared CSVs, so it trades per-commit durability
+# for far fewer fsyncs and a larger page cache.
+LOAD_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB
+    "PRAGMA mmap_size=1073741824",  # 1 GiB
+    "PRAGMA locking_mode=EXCLUSIVE",
+)
+
+# SQLite builds before 3.32 reject statements with more bound parameters than this
+MAX_SQL_PARAMS = 999
+
+# Bytes of CSV the Arrow reader parses per block (blocks are parsed in parallel)
+CSV_BLOCK_SIZE = 8 << 20  # 8 MiB
+
+# Rows converted to Python tuples at a time while inserting a table
+ROW_BATCH_SIZE = 65_536
+
+# Cells the prepared CSVs use for missing values (the same tokens pandas'
+# read_csv treats as NaN); they are loaded into the DW as NULL
+NA_TOKENS = frozenset(
+    {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+        "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    }
+)  # fmt: skip
+
+
+# Secondary indexes on the sale fact table: index name -> table (columns)
+SALE_INDEXES = {
+    "idx_sale_pid": "sale (product_id)",
+    "idx_sale_cid": "sale (customer_id)",
+}
+
 
 # -------------------------------------------------------------------
 # Schema creation
@@ -59,7 +102,7 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
 
     - customer (dimension)
     - product  (dimension)
-    - sale     (fact)
+    - sale     (fact), indexed on product_id and customer_id
 
     All relevant columns from the prepared CSV files are included.
     """
@@ -111,6 +154,24 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
         """
     )
 
+    create_sale_indexes(cursor)
+
+
+def create_sale_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the indexes on the sale fact table's foreign keys (used by the OLAP joins).
+    """
+    for name, target in SALE_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def drop_sale_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Drop the sale indexes so a bulk load does not update them row by row.
+    """
+    for name in SALE_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
 
 def delete_existing_records(cursor: sqlite3.Cursor) -> None:
     """
@@ -130,11 +191,123 @@ def delete_existing_records(cursor: sqlite3.Cursor) -> None:
 # -------------------------------------------------------------------
 
 
-def insert_customers(customers_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+def read_prepared_table(csv_path: Path, source_columns: list[str]) -> pa.Table:
+    """
+    Read the `source_columns` of a prepared CSV file into an Arrow table.
+
+    Arrow parses the file's blocks on its own thread pool without holding the
+    GIL, so the reads can run in the background while rows are inserted.
+    Missing-value tokens become nulls so they load as NULL.
+
+    Values stay as text; the INTEGER/REAL column affinity of the DW tables
+    stores numeric text as numbers.
+    """
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+
+    missing = [col for col in source_columns if col not in header]
+    if missing:
+        raise ValueError(
+            f"Missing columns in {csv_path.name}: {missing}\n"
+            f"Available columns: {header}"
+        )
+
+    convert_options = pv.ConvertOptions(
+        include_columns=source_columns,
+        column_types={col: pa.string() for col in source_columns},
+        null_values=sorted(NA_TOKENS),
+        strings_can_be_null=True,
+    )
+    return pv.read_csv(
+        csv_path,
+        read_options=pv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=convert_options,
+    )
+
+
+def iter_table_rows(table: pa.Table) -> Iterator[tuple[str | None, ...]]:
+    """
+    Yield the rows of an Arrow table as tuples, converting one batch at a time.
+    """
+    for batch in table.to_batches(max_chunksize=ROW_BATCH_SIZE):
+        yield from zip(*(column.to_pylist() for column in batch.columns), strict=True)
+
+
+class InsertSQL(NamedTuple):
+    """INSERT ... ON CONFLICT DO NOTHING statements for one DW table, built once at import time."""
+
+    single_row: str  # one row of placeholders, for executemany
+    chunk: str  # chunk_rows rows of placeholders in one statement
+    chunk_rows: int
+
+
+def prepare_insert(table: str, columns: Sequence[str], pk: str) -> InsertSQL:
+    """
+    Build the INSERT statements used to load `columns` of `table`.
+
+    The chunk statement carries as many rows as fit under MAX_SQL_PARAMS.
+    Rows whose primary key `pk` is already in the table (e.g. a duplicate later
+    in the same CSV) are skipped by ON CONFLICT(pk) DO NOTHING, so the first
+    row for each key wins. Other constraint violations (e.g. NOT NULL) still
+    raise, unlike INSERT OR IGNORE.
+    """
+    chunk_rows = max(1, MAX_SQL_PARAMS // len(columns))
+    column_list = ", ".join(columns)
+    row_placeholder = "(" + ", ".join(["?"] * len(columns)) + ")"
+    prefix = f"INSERT INTO {table} ({column_list}) VALUES "  # noqa: S608
+    on_conflict = f" ON CONFLICT({pk}) DO NOTHING"
+    return InsertSQL(
+        single_row=prefix + row_placeholder + on_conflict,
+        chunk=prefix + ", ".join([row_placeholder] * chunk_rows) + on_conflict,
+        chunk_rows=chunk_rows,
+    )
+
+
+def make_row_inserter(
+    insert_sql: InsertSQL,
+) -> Callable[[sqlite3.Cursor, Iterable[Sequence]], None]:
+    """
+    Return an inserter specialized for one table's INSERT statements.
+
+    The statements and chunk size are bound once as closure variables, so the
+    returned function's loop does no attribute or mapping lookups. It sends
+    one multi-row statement per chunk of `insert_sql.chunk_rows` rows; the
+    rows left over after the last full chunk go through executemany with the
+    single-row statement.
+
+    Each row must list its values in the same order as the statement's columns.
+    """
+    single_row_sql, chunk_sql, chunk_rows = insert_sql
+
+    def insert_rows(cursor: sqlite3.Cursor, rows: Iterable[Sequence]) -> None:
+        rows = iter(rows)
+        while batch := list(islice(rows, chunk_rows)):
+            if len(batch) < chunk_rows:
+                cursor.executemany(single_row_sql, batch)
+                break
+            cursor.execute(chunk_sql, list(chain.from_iterable(batch)))
+
+    return insert_rows
+
+
+# DW column -> prepared CSV column, in insert order
+CUSTOMER_COLUMN_MAPPING = {
+    "customer_id": "CustomerID",
+    "name": "Name",
+    "region": "Region",
+    "join_date": "JoinDate",
+    "loyalty_points": "LoyaltyPoints",
+    "preferred_contact_method": "PreferredContactMethod",
+}
+CUSTOMER_INSERT_SQL = prepare_insert("customer", list(CUSTOMER_COLUMN_MAPPING), "customer_id")
+_insert_customer_rows = make_row_inserter(CUSTOMER_INSERT_SQL)
+
+
+def insert_customers(customers: pa.Table, cursor: sqlite3.Cursor) -> None:
     """
     Insert customer data into the DW customer dimension table.
 
-    Source file:
+    Source file (read with read_prepared_table):
         data/prepared/customers_prepared.csv
 
     Expected columns in the CSV:
@@ -153,53 +326,30 @@ def insert_customers(customers_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None
         - LoyaltyPoints         -> loyalty_points
         - PreferredContactMethod -> preferred_contact_method
 
-    Duplicate CustomerID rows are removed before insertion
-    to avoid primary key constraint violations.
+    Rows repeating an earlier CustomerID are skipped by the
+    customer_id primary key (ON CONFLICT DO NOTHING).
     """
-    column_mapping = {
-        "customer_id": "CustomerID",
-        "name": "Name",
-        "region": "Region",
-        "join_date": "JoinDate",
-        "loyalty_points": "LoyaltyPoints",
-        "preferred_contact_method": "PreferredContactMethod",
-    }
-
-    # Remove duplicate customers (keep first row for each CustomerID)
-    customers_df = customers_df.drop_duplicates(subset=["CustomerID"])
+    _insert_customer_rows(cursor, iter_table_rows(customers))
 
-    missing = [src for src in column_mapping.values() if src not in customers_df.columns]
-    if missing:
-        raise ValueError(
-            f"Missing columns in customers_prepared.csv: {missing}\n"
-            f"Available columns: {list(customers_df.columns)}"
-        )
 
-    ordered_df = customers_df[list(column_mapping.values())].rename(
-        columns={src: dst for dst, src in column_mapping.items()}
-    )
+# DW column -> prepared CSV column, in insert order
+PRODUCT_COLUMN_MAPPING = {
+    "product_id": "productid",
+    "product_name": "productname",
+    "category": "category",
+    "unit_price": "unitprice",
+    "stock_quantity": "stockquantity",
+    "supplier_name": "suppliername",
+}
+PRODUCT_INSERT_SQL = prepare_insert("product", list(PRODUCT_COLUMN_MAPPING), "product_id")
+_insert_product_rows = make_row_inserter(PRODUCT_INSERT_SQL)
 
-    cursor.executemany(
-        """
-        INSERT INTO customer (
-            customer_id,
-            name,
-            region,
-            join_date,
-            loyalty_points,
-            preferred_contact_method
-        )
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        ordered_df.itertuples(index=False, name=None),
-    )
 
-
-def insert_products(products_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+def insert_products(products: pa.Table, cursor: sqlite3.Cursor) -> None:
     """
     Insert product data into the DW product dimension table.
 
-    Source file:
+    Source file (read with read_prepared_table):
         data/prepared/products_prepared.csv
 
     Expected columns in the CSV:
@@ -218,52 +368,32 @@ def insert_products(products_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
         - stockquantity -> stock_quantity
         - suppliername  -> supplier_name
 
-    Duplicate productid rows are removed before insertion.
+    Rows repeating an earlier productid are skipped (ON CONFLICT DO NOTHING).
     """
-    column_mapping = {
-        "product_id": "productid",
-        "product_name": "productname",
-        "category": "category",
-        "unit_price": "unitprice",
-        "stock_quantity": "stockquantity",
-        "supplier_name": "suppliername",
-    }
-
-    # Remove duplicate products (keep first row for each productid)
-    products_df = products_df.drop_duplicates(subset=["productid"])
-
-    missing = [src for src in column_mapping.values() if src not in products_df.columns]
-    if missing:
-        raise ValueError(
-            f"Missing columns in products_prepared.csv: {missing}\n"
-            f"Available columns: {list(products_df.columns)}"
-        )
-
-    ordered_df = products_df[list(column_mapping.values())].rename(
-        columns={src: dst for dst, src in column_mapping.items()}
-    )
-
-    cursor.executemany(
-        """
-        INSERT INTO product (
-            product_id,
-            product_name,
-            category,
-            unit_price,
-            stock_quantity,
-            supplier_name
-        )
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        ordered_df.itertuples(index=False, name=None),
-    )
-
-
-def insert_sales(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
+    _insert_product_rows(cursor, iter_table_rows(products))
+
+
+# DW column -> prepared CSV column, in insert order
+SALE_COLUMN_MAPPING = {
+    "sale_id": "TransactionID",
+    "customer_id": "CustomerID",
+    "product_id": "ProductID",
+    "store_id": "StoreID",
+    "campaign_id": "CampaignID",
+    "sale_date": "SaleDate",
+    "sale_amount": "SaleAmount",
+    "discount_percent": "DiscountPercent",
+    "payment_type": "PaymentType",
+}
+SALE_INSERT_SQL = prepare_insert("sale", list(SALE_COLUMN_MAPPING), "sale_id")
+_insert_sale_rows = make_row_inserter(SALE_INSERT_SQL)
+
+
+def insert_sales(sales: pa.Table, cursor: sqlite3.Cursor) -> None:
     """
     Insert sales data into the DW sale fact table.
 
-    Source file:
+    Source file (read with read_prepared_table):
         data/prepared/sales_prepared.csv
 
     Expected columns in the CSV:
@@ -288,51 +418,9 @@ def insert_sales(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
         - DiscountPercent -> discount_percent
         - PaymentType     -> payment_type
 
-    Duplicate TransactionID rows are removed before insertion.
+    Rows repeating an earlier TransactionID are skipped (ON CONFLICT DO NOTHING).
     """
-    column_mapping = {
-        "sale_id": "TransactionID",
-        "customer_id": "CustomerID",
-        "product_id": "ProductID",
-        "store_id": "StoreID",
-        "campaign_id": "CampaignID",
-        "sale_date": "SaleDate",
-        "sale_amount": "SaleAmount",
-        "discount_percent": "DiscountPercent",
-        "payment_type": "PaymentType",
-    }
-
-    # Remove duplicate sales (keep first row for each TransactionID)
-    sales_df = sales_df.drop_duplicates(subset=["TransactionID"])
-
-    missing = [src for src in column_mapping.values() if src not in sales_df.columns]
-    if missing:
-        raise ValueError(
-            f"Missing columns in sales_prepared.csv: {missing}\n"
-            f"Available columns: {list(sales_df.columns)}"
-        )
-
-    ordered_df = sales_df[list(column_mapping.values())].rename(
-        columns={src: dst for dst, src in column_mapping.items()}
-    )
-
-    cursor.executemany(
-        """
-        INSERT INTO sale (
-            sale_id,
-            customer_id,
-            product_id,
-            store_id,
-            campaign_id,
-            sale_date,
-            sale_amount,
-            discount_percent,
-            payment_type
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        ordered_df.itertuples(index=False, name=None),
-    )
+    _insert_sale_rows(cursor, iter_table_rows(sales))
 
 
 # -------------------------------------------------------------------
@@ -348,8 +436,9 @@ def load_data_to_db() -> None:
     1. Connect to the SQLite DW database (creates the file if needed).
     2. Create the DW schema (dimension + fact tables).
     3. Clear existing records from the DW tables.
-    4. Load prepared CSV files into pandas DataFrames.
-    5. Insert records into the DW tables.
+    4. Read the prepared CSV files with Arrow, in background threads.
+    5. Insert records into the DW tables (sale indexes are dropped first
+       and rebuilt once the tables are loaded).
 
     This function is designed to be safe to run multiple times:
     each run replaces the existing DW data with a fresh load
@@ -358,27 +447,55 @@ def load_data_to_db() -> None:
     print(f"📁 Using DW database at: {DB_PATH}")
     conn = sqlite3.connect(DB_PATH)
     try:
-        cursor = conn.cursor()
-
-        print("🧱 Creating schema...")
-        create_schema(cursor)
-
-        print("🧹 Clearing existing records...")
-        delete_existing_records(cursor)
-
+        # Start parsing the three prepared CSVs in the background so products
+        # and sales are read while the schema is reset and customers inserted
         print("📥 Loading prepared CSV files...")
-        customers_df = pd.read_csv(PREPARED_DATA_DIR / "customers_prepared.csv")
-        products_df = pd.read_csv(PREPARED_DATA_DIR / "products_prepared.csv")
-        sales_df = pd.read_csv(PREPARED_DATA_DIR / "sales_prepared.csv")
-
-        print("📌 Inserting customers...")
-        insert_customers(customers_df, cursor)
-
-        print("📌 Inserting products...")
-        insert_products(products_df, cursor)
-
-        print("📌 Inserting sales...")
-        insert_sales(sales_df, cursor)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            customers = pool.submit(
+                read_prepared_table,
+                PREPARED_DATA_DIR / "customers_prepared.csv",
+                list(CUSTOMER_COLUMN_MAPPING.values()),
+            )
+            products = pool.submit(
+                read_prepared_table,
+                PREPARED_DATA_DIR / "products_prepared.csv",
+                list(PRODUCT_COLUMN_MAPPING.values()),
+            )
+            sales = pool.submit(
+                read_prepared_table,
+                PREPARED_DATA_DIR / "sales_prepared.csv",
+                list(SALE_COLUMN_MAPPING.values()),
+            )
+
+            for pragma in LOAD_PRAGMAS:
+                conn.execute(pragma)
+            cursor = conn.cursor()
+
+            # One explicit transaction around the whole load, committed once at the end
+            conn.execute("BEGIN")
+
+            print("🧱 Creating schema...")
+            create_schema(cursor)
+
+            print("🧹 Clearing existing records...")
+            delete_existing_records(cursor)
+
+            # Build the sale indexes once on the loaded table instead of per row
+            drop_sale_indexes(cursor)
+
+            print("📌 Inserting customers...")
+            insert_customers(customers.result(), cursor)
+
+            print("📌 Inserting products...")
+            insert_products(products.result(), cursor)
+
+            print("📌 Inserting sales...")
+            insert_sales(sales.result(), cursor)
+
+        print("🗂️ Rebuilding indexes...")
+        create_sale_indexes(cursor)
+        # Refresh query-planner statistics for the freshly loaded tables
+        cursor.execute("ANALYZE")
 
         conn.commit()
         print("✅ ETL complete: Data Warehouse populated successfully.")
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
 import pathlib
 import sqlite3
+import sys
+from typing import Self
+
 from loguru import logger  # Assurez-vous que loguru est installé
 
 # --- 1. Configuration des Chemins ---
@@ -13,6 +17,28 @@ DATA_DIR: pathlib.Path = PROJECT_ROOT_DIR / "data"
 WAREHOUSE_DIR: pathlib.Path = DATA_DIR / "dw"
 DB_PATH: pathlib.Path = WAREHOUSE_DIR / "smart_store_dw.db"
 OLAP_OUTPUT_DIR: pathlib.Path = DATA_DIR / "olap_cubing_outputs"
+CUBE_FILENAME: str = "multidimensional_olap_cube.parquet"
+
+# P6 cube (Rentabilité Catégorie par Région) computed inside the DW: SQLite does
+# the joins and the GROUP BY, so only the aggregated rows reach Python.
+# Inner joins + the IS NOT NULL filters match the pandas path (left merges
+# followed by a groupby that drops missing keys). SQLite adds floats without
+# error compensation, so the sum is rounded back to cents (sale amounts are
+# currency) and the mean is derived from it; TOTAL() returns 0.0 like pandas'
+# sum for groups without any amount.
+OLAP_CUBE_QUERY = """
+    SELECT c.region,
+           p.category,
+           ROUND(TOTAL(s.sale_amount), 2) AS sale_amount_sum,
+           ROUND(TOTAL(s.sale_amount), 2) / COUNT(s.sale_amount) AS sale_amount_mean,
+           COUNT(s.sale_id) AS sale_id_count
+    FROM sale s
+    JOIN product p ON p.product_id = s.product_id
+    JOIN customer c ON c.customer_id = s.customer_id
+    WHERE c.region IS NOT NULL AND p.category IS NOT NULL
+    GROUP BY c.region, p.category
+    ORDER BY c.region, p.category
+"""
 
 # Crée le répertoire de sortie s'il n'existe pas
 OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -27,57 +53,142 @@ logger.add(
 )
 # --- Fin Configuration ---
 
+# DW keys that are never NULL (primary keys / NOT NULL foreign keys) and fit in
+# int32; loading them as int32 halves the bytes the merges and groupby move.
+KEY_DTYPES = {
+    "sale_id": "int32[pyarrow]",
+    "customer_id": "int32[pyarrow]",
+    "product_id": "int32[pyarrow]",
+}
 
-def ingest_sales_data_from_dw() -> pd.DataFrame:
-    """
-    Ingest sale fact table data from SQLite data warehouse.
-    """
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        sales_df = pd.read_sql_query("SELECT * FROM sale", conn)
-        conn.close()
-        logger.info("Sales data successfully loaded from SQLite data warehouse.")
-        return sales_df
-    except sqlite3.OperationalError as e:
-        logger.error(f"Erreur de connexion/lecture de la DB : {e}. Vérifiez le chemin {DB_PATH}.")
-        raise
-    except Exception as e:
-        logger.error(f"Erreur lors du chargement des données de vente : {e}")
-        raise
+# Tables and columns of the DW schema (see etl_to_dw.create_schema). DWReader only
+# puts names from here into its SELECTs, since identifiers cannot be bound as
+# query parameters.
+DW_COLUMNS = {
+    "customer": frozenset(
+        {"customer_id", "name", "region", "join_date", "loyalty_points", "preferred_contact_method"}
+    ),
+    "product": frozenset(
+        {"product_id", "product_name", "category", "unit_price", "stock_quantity", "supplier_name"}
+    ),
+    "sale": frozenset(
+        {
+            "sale_id",
+            "customer_id",
+            "product_id",
+            "store_id",
+            "campaign_id",
+            "sale_date",
+            "sale_amount",
+            "discount_percent",
+            "payment_type",
+        }
+    ),
+}
 
 
-def ingest_dim_table(table_name: str) -> pd.DataFrame:
+def downcast_keys(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Ingest a dimension table (e.g., product or customer) from the DW.
+    Cast the DW key columns present in df to int32.
     """
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-        conn.close()
-        logger.info(f"{table_name} data successfully loaded.")
-        return df
-    except Exception as e:
-        logger.error(f"Error loading {table_name} table data: {e}")
-        raise
+    return df.astype({col: dtype for col, dtype in KEY_DTYPES.items() if col in df.columns})
 
 
-def generate_column_names(dimensions: list, metrics: dict) -> list:
+class DWReader:
     """
-    Generate explicit column names for OLAP cube based on dimensions and metrics.
+    Read-only access to the SQLite data warehouse over one cached connection.
+
+    The connection is opened once in __enter__ (read-only) and the read PRAGMAs
+    run once, so the sale, product and customer queries reuse the connection's
+    page cache instead of each reopening the database file.
+
+    Example:
+        with DWReader() as dw:
+            sales_df = dw.sales(["sale_id", "sale_amount"])
+            product_df = dw.dim("product", ["product_id", "category"])
     """
-    column_names = dimensions.copy()
-    for column, agg_funcs in metrics.items():
-        if isinstance(agg_funcs, list):
-            for func in agg_funcs:
-                column_names.append(f"{column}_{func}")
-        else:
-            column_names.append(f"{column}_{agg_funcs}")
 
-    # Nettoyage des doubles underscores si nécessaire
-    column_names = [col.replace('__', '_').rstrip("_") for col in column_names]
+    READ_PRAGMAS = (
+        "PRAGMA cache_size=-65536",  # 64 MiB
+        "PRAGMA mmap_size=1073741824",  # 1 GiB
+        "PRAGMA query_only=1",
+    )
+
+    def __init__(self, db_path: pathlib.Path = DB_PATH):
+        self.db_path = pathlib.Path(db_path).resolve()
+        self.conn = None
+
+    def __enter__(self) -> Self:
+        try:
+            # as_uri() percent-encodes characters such as ? and # in the path
+            self.conn = sqlite3.connect(self.db_path.as_uri() + "?mode=ro", uri=True)
+            for pragma in self.READ_PRAGMAS:
+                self.conn.execute(pragma)
+        except sqlite3.OperationalError as e:
+            logger.error(
+                f"Erreur de connexion/lecture de la DB : {e}. Vérifiez le chemin {self.db_path}."
+            )
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.conn.close()
+        self.conn = None
+
+    def query(self, sql: str, **read_kwargs) -> pd.DataFrame:
+        """
+        Run a SELECT against the DW and return the result as a DataFrame.
+
+        Extra keyword arguments are passed on to pd.read_sql_query.
+        """
+        return pd.read_sql_query(sql, self.conn, **read_kwargs)
+
+    @staticmethod
+    def select_sql(table_name: str, columns: list) -> str:
+        """
+        Build the SELECT for the given columns of a DW table.
+
+        Raises ValueError for a table or column that is not in DW_COLUMNS.
+        """
+        if table_name not in DW_COLUMNS:
+            raise ValueError(f"Unknown DW table: {table_name!r}")
+        unknown = [col for col in columns if col not in DW_COLUMNS[table_name]]
+        if unknown or not columns:
+            raise ValueError(f"Unknown or missing columns for {table_name}: {unknown}")
+        return f"SELECT {', '.join(columns)} FROM {table_name}"  # noqa: S608 (validated above)
+
+    def sales(self, columns: list) -> pd.DataFrame:
+        """
+        Ingest sale fact table data from SQLite data warehouse.
+
+        Only the requested columns are selected, so unused text columns
+        (e.g. payment_type) are never read or turned into Python strings.
+        Columns are PyArrow-backed, like the dimension tables.
+        """
+        try:
+            sql = self.select_sql("sale", columns)
+            sales_df = downcast_keys(self.query(sql, dtype_backend="pyarrow"))
+            logger.info("Sales data successfully loaded from SQLite data warehouse.")
+            return sales_df
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des données de vente : {e}")
+            raise
+
+    def dim(self, table_name: str, columns: list) -> pd.DataFrame:
+        """
+        Ingest the given columns of a dimension table (e.g., product or customer) from the DW.
 
-    logger.info(f"Generated column names for OLAP cube: {column_names}")
-    return column_names
+        Columns are PyArrow-backed (dtype_backend="pyarrow"): strings stay in
+        Arrow buffers instead of one Python object per row.
+        """
+        try:
+            sql = self.select_sql(table_name, columns)
+            df = downcast_keys(self.query(sql, dtype_backend="pyarrow"))
+            logger.info(f"{table_name} data successfully loaded.")
+            return df
+        except Exception as e:
+            logger.error(f"Error loading {table_name} table data: {e}")
+            raise
 
 
 def create_olap_cube(data_df: pd.DataFrame, dimensions: list, metrics: dict) -> pd.DataFrame:
@@ -89,11 +200,14 @@ def create_olap_cube(data_df: pd.DataFrame, dimensions: list, metrics: dict) ->
         return pd.DataFrame()
 
     try:
-        grouped = data_df.groupby(dimensions, dropna=True)
-        cube = grouped.agg(metrics).reset_index()
-
-        explicit_columns = generate_column_names(dimensions, metrics)
-        cube.columns = explicit_columns
+        # observed=True: only aggregate the category combinations that occur.
+        # List-valued metrics give (column, func) columns, flattened to column_func.
+        grouped = data_df.groupby(dimensions, dropna=True, observed=True)
+        metric_lists = {col: list(np.atleast_1d(funcs)) for col, funcs in metrics.items()}
+        cube = grouped.agg(metric_lists).reset_index()
+        cube.columns = [
+            f"{col}_{func}" if func else col for col, func in cube.columns.to_flat_index()
+        ]
 
         logger.info(f"OLAP cube created with dimensions: {dimensions}")
         return cube
@@ -104,51 +218,87 @@ def create_olap_cube(data_df: pd.DataFrame, dimensions: list, metrics: dict) ->
         raise
 
 
-def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
+def query_olap_cube() -> pd.DataFrame:
     """
-    Write the OLAP cube to a CSV file.
+    Compute the region x category OLAP cube with one SQL query against the DW.
     """
-    output_path = OLAP_OUTPUT_DIR.joinpath(filename)
-    cube.to_csv(output_path, index=False)
-    logger.info(f"OLAP cube saved to {output_path}.")
+    with DWReader() as dw:
+        cube = dw.query(OLAP_CUBE_QUERY)
+    logger.info(f"OLAP cube computed in the data warehouse ({len(cube)} rows).")
+    return cube
 
 
-def main():
+def build_cube_in_memory(db_path: pathlib.Path = DB_PATH) -> pd.DataFrame:
     """
-    Execute OLAP cubing process for Category and Region Profitability (P6 Goal).
-    """
-    logger.info("Starting OLAP Cubing process for P6 Goal (Category & Region Profitability)...")
+    Build the same cube in pandas: load the tables, merge them and group by.
 
-    # Step 1: Ingest all necessary data (Fact and Dimensions)
-    sales_df = ingest_sales_data_from_dw()
-    product_df = ingest_dim_table("product")
-    customer_df = ingest_dim_table("customer")
+    The metric columns are returned as numpy float64/int64 like the SQL cube,
+    since the analysis heatmap cannot plot PyArrow-backed columns.
+    """
+    # Step 1: Ingest the columns the cube needs (Fact and Dimensions)
+    with DWReader(db_path) as dw:
+        sales_df = dw.sales(["sale_id", "customer_id", "product_id", "sale_amount"])
+        product_df = dw.dim("product", ["product_id", "category"])
+        customer_df = dw.dim("customer", ["customer_id", "region"])
 
     # Step 2: Join tables (Create the Data Mart required for the cube)
-    # Goal: Join sale, product (for category), and customer (for region)
-    merged_df = pd.merge(
-        sales_df, product_df[['product_id', 'category']], on="product_id", how="left"
-    )
-    final_df = pd.merge(
-        merged_df, customer_df[['customer_id', 'region']], on="customer_id", how="left"
+    # Goal: Look up category (product) and region (customer) for each sale in one
+    # pass with .map on the dimension keys; unknown keys become NaN like a left merge.
+    # Few distinct regions/categories: keep them as categories so the cube groups
+    # on integer codes, not strings.
+    product_category = product_df.set_index("product_id")["category"].astype("category")
+    customer_region = customer_df.set_index("customer_id")["region"].astype("category")
+    final_df = sales_df.assign(
+        category=sales_df["product_id"].map(product_category),
+        region=sales_df["customer_id"].map(customer_region),
     )
 
-    if final_df.isnull().any().any():
+    # Only the looked-up dimension columns can gain NaN from unknown keys
+    if final_df["category"].isna().any() or final_df["region"].isna().any():
         logger.warning("Merged DataFrame contains NaN values, typically due to missing dimensions.")
 
     # Step 3: Define dimensions and metrics for the cube (P6 Goal)
     dimensions = ["region", "category"]  # Dimensions P6: Rentabilité Catégorie par Région
     metrics = {"sale_amount": ["sum", "mean"], "sale_id": "count"}
 
-    # Step 4: Create the cube
-    olap_cube = create_olap_cube(final_df, dimensions, metrics)
+    # Step 4: Create the cube, with numpy metric columns (the inputs were read
+    # with dtype_backend="pyarrow")
+    cube = create_olap_cube(final_df, dimensions, metrics)
+    metric_columns = cube.columns.difference(dimensions)
+    return cube.astype({col: cube[col].dtype.numpy_dtype for col in metric_columns})
+
+
+def write_cube(cube: pd.DataFrame, filename: str) -> None:
+    """
+    Write the OLAP cube to the output folder: Parquet (zstd) for a .parquet
+    filename, CSV otherwise.
+    """
+    output_path = OLAP_OUTPUT_DIR.joinpath(filename)
+    if output_path.suffix == ".parquet":
+        cube.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False)
+    else:
+        cube.to_csv(output_path, index=False)
+    logger.info(f"OLAP cube saved to {output_path}.")
+
+
+def main(in_memory: bool = False):
+    """
+    Execute OLAP cubing process for Category and Region Profitability (P6 Goal).
+
+    By default the cube is aggregated by SQLite inside the DW; pass
+    in_memory=True (or --in-memory on the command line) to build it with pandas.
+    """
+    logger.info("Starting OLAP Cubing process for P6 Goal (Category & Region Profitability)...")
+
+    # Steps 1-4: Join sale/product/customer and aggregate by region and category
+    olap_cube = build_cube_in_memory() if in_memory else query_olap_cube()
 
-    # Step 5: Save the cube to a CSV file (Using the required name)
-    write_cube_to_csv(olap_cube, "multidimensional_olap_cube.csv")
+    # Step 5: Save the cube as Parquet (typed, columnar; read by goal_profitability_analysis)
+    write_cube(olap_cube, CUBE_FILENAME)
 
     logger.info("OLAP Cubing process completed successfully.")
-    logger.info(f"Output saved to {OLAP_OUTPUT_DIR / 'multidimensional_olap_cube.csv'}")
+    logger.info(f"Output saved to {OLAP_OUTPUT_DIR / CUBE_FILENAME}")
 
 
 if __name__ == "__main__":
-    main()
+    main(in_memory="--in-memory" in sys.argv[1:])
@@ -11,7 +11,7 @@ DATA_DIR: pathlib.Path = PROJECT_ROOT_DIR / "data"
 OLAP_OUTPUT_DIR: pathlib.Path = DATA_DIR / "olap_cubing_outputs"
 
 # IMPORTANT: Use the file name generated by the cubing script
-CUBE_FILENAME = "multidimensional_olap_cube.csv"
+CUBE_FILENAME = "multidimensional_olap_cube.parquet"
 CUBE_PATH: pathlib.Path = OLAP_OUTPUT_DIR / CUBE_FILENAME
 # --- End Configuration ---
 
@@ -22,7 +22,7 @@ def load_cube_data() -> pd.DataFrame:
         print(f"Error: Cube file not found at {CUBE_PATH}. Please run cubing.py first.")
         return pd.DataFrame()
 
-    cube_df = pd.read_csv(CUBE_PATH)
+    cube_df = pd.read_parquet(CUBE_PATH)
     print(f"Cube loaded successfully. {len(cube_df)} combinations found.")
     return cube_df
 
@@ -56,13 +56,19 @@ def perform_olap_analysis(df: pd.DataFrame):
     print(dice_view[['region', 'category', REVENUE_COL]].to_markdown(index=False))
 
     # Prepare Pivot Table for Visualization
-    pivot_table = df.pivot_table(
-        index='category', columns='region', values=REVENUE_COL, fill_value=0
-    )
+    pivot_table = build_pivot_table(df)
 
     return pivot_table, dice_view
 
 
+def build_pivot_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Pivots total revenue into a category x region table for the heatmap."""
+    # observed=True: the Parquet cube can keep region/category as categoricals
+    return df.pivot_table(
+        index='category', columns='region', values='sale_amount_sum', fill_value=0, observed=True
+    )
+
+
 def visualize_results(pivot_table: pd.DataFrame):
     """Creates the main visualization (Heatmap) for the report and saves it."""
 
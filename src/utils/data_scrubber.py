@@ -25,7 +25,10 @@ Example:
 """
 
 import io
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from typing import Dict, Tuple, Union, List
 
 
@@ -139,11 +142,62 @@ class DataScrubber:
             ValueError: If the specified column not found in the DataFrame.
         """
         try:
-            self.df[column] = self.df[column].str.lower().str.strip()
-            return self.df
+            values = self.df[column]
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
+        if values.dtype == object:
+            # Object columns of plain strings go through one Arrow pass
+            # (lower + trim in C++) instead of two Python-level .str passes
+            try:
+                arr = pa.array(values.to_numpy(), type=pa.string(), from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                arr = None  # mixed types: let pandas handle them below
+            if arr is not None:
+                normalized = pc.utf8_trim_whitespace(pc.utf8_lower(arr))
+                # Keep the original missing values (NaN stays NaN, not None)
+                result = pd.Series(normalized.to_numpy(zero_copy_only=False), index=values.index)
+                self.df[column] = result.where(values.notna(), values)
+                return self.df
+
+        self.df[column] = values.str.lower().str.strip()
+        return self.df
+
+    def format_categorical_column_strings(self, column: str, case: str = 'lower') -> pd.DataFrame:
+        """
+        Format a low-cardinality string column by trimming whitespace and normalizing case.
+
+        The column is cast to the category dtype first, so the string operations run once
+        per distinct value instead of once per row. Missing values stay missing.
+
+        Parameters:
+            column (str): Name of the column to format.
+            case (str): One of 'lower', 'upper' or 'title'.
+
+        Returns:
+            pd.DataFrame: Updated DataFrame with the column as a normalized category.
+
+        Raises:
+            ValueError: If the specified column not found in the DataFrame,
+                        or if the case is not supported.
+        """
+        if case not in ('lower', 'upper', 'title'):
+            raise ValueError(f"Unsupported case '{case}'. Use 'lower', 'upper' or 'title'.")
+        try:
+            categorical = self.df[column].astype('category')
+        except KeyError:
+            raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+
+        normalized = getattr(categorical.cat.categories.astype(str).str.strip().str, case)()
+        # Raw spellings like 'EAST' and ' east' collapse to one value, so remap the
+        # codes onto the unique normalized categories instead of renaming in place.
+        categories = normalized.unique()
+        remap = categories.get_indexer(normalized)
+        codes = categorical.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, remap[codes], -1)
+        self.df[column] = pd.Categorical.from_codes(codes, categories=categories)
+        return self.df
+
     def format_column_strings_to_upper_and_trim(self, column: str) -> pd.DataFrame:
         """
         Format strings in a specified column by converting to uppercase and trimming whitespace.
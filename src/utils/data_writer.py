@@ -0,0 +1,121 @@
+"""
+utils/data_writer.py
+
+Write prepared DataFrames to disk with Arrow's C++ writers.
+
+CSV files go through pyarrow.csv.write_csv, which formats values in C++ and
+writes in fixed-size batches. Paths ending in .parquet are written as Parquet
+so typed data can skip CSV altogether.
+
+Example:
+    from utils.data_writer import write_prepared_data
+    write_prepared_data(df, PREPARED_DATA_DIR / "sales_prepared.csv")
+
+"""
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+
+# Rows formatted per batch by the Arrow CSV writer
+CSV_BATCH_SIZE: int = 65_536
+
+
+def _to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a DataFrame to an Arrow table, keeping pandas' CSV conventions for dates and bools.
+
+    pandas writes a datetime column whose values are all at midnight as plain
+    YYYY-MM-DD dates, so such columns are cast to date32 before writing. Other
+    datetimes are cast to whole seconds so Arrow does not append nanoseconds,
+    bools are written as True/False instead of Arrow's true/false, and
+    whole-number floats keep their trailing .0.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame to convert.
+
+    Returns:
+        pa.Table: Arrow table without the pandas index.
+
+    Raises:
+        pa.ArrowNotImplementedError: For timezone-aware or sub-second datetimes
+            and for floats pandas would write with an exponent, which Arrow
+            formats differently; the caller falls back to to_csv.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            if field.type.tz is not None:
+                raise pa.ArrowNotImplementedError("timezone-aware datetimes")
+            values = df[field.name].dropna()
+            if (values == values.dt.normalize()).all():
+                table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+            elif (values == values.dt.floor("s")).all():
+                table = table.set_column(i, field.name, table.column(i).cast(pa.timestamp("s")))
+            else:
+                raise pa.ArrowNotImplementedError("sub-second datetimes")
+        elif pa.types.is_floating(field.type):
+            # Arrow switches to exponents at different magnitudes than Python's repr
+            values = df[field.name].dropna().abs()
+            in_fixed_range = (values == 0) | ((values >= 1e-4) & (values < 1e15))
+            if not (in_fixed_range | (values == np.inf)).all():
+                raise pa.ArrowNotImplementedError("floats outside the fixed-notation range")
+            # Arrow writes 866.0 as 866 and -0.0 as -0, so add back the .0
+            text = pc.replace_substring_regex(
+                table.column(i).cast(pa.string()), pattern=r"^(-?\d+)$", replacement=r"\1.0"
+            )
+            table = table.set_column(i, field.name, text)
+        elif pa.types.is_boolean(field.type):
+            labels = pc.if_else(table.column(i), "True", "False")
+            table = table.set_column(i, field.name, labels)
+    return table
+
+
+def write_prepared_data(
+    df: pd.DataFrame, file_path: pathlib.Path, append: bool = False
+) -> None:
+    """
+    Write a DataFrame to CSV (or Parquet, by file extension) without the index.
+
+    Values are written unquoted and formatted like pandas' to_csv does. If Arrow
+    cannot convert a column (e.g. mixed Python types), formats it differently,
+    or a value would need quoting, the file is written with DataFrame.to_csv
+    instead.
+
+    Parameters:
+        df (pd.DataFrame): The DataFrame to write.
+        file_path (pathlib.Path): Destination path ending in .csv or .parquet.
+        append (bool): Append rows to an existing CSV without writing the header.
+            Not supported for Parquet.
+    """
+    file_path = pathlib.Path(file_path)
+    if file_path.suffix == ".parquet":
+        if append:
+            raise ValueError("Appending is only supported for CSV files.")
+        df.to_parquet(file_path, engine="pyarrow", index=False)
+        return
+
+    header = ",".join(str(col) for col in df.columns)
+    # Where this write starts, so a failed Arrow write can be cut off before the fallback
+    start = file_path.stat().st_size if append and file_path.exists() else 0
+    try:
+        if '"' in header or header.count(",") != len(df.columns) - 1:
+            raise pa.ArrowInvalid("column names need quoting")
+        table = _to_arrow_table(df)
+        # Arrow quotes header names regardless of quoting_style, so write the header here
+        write_options = pv.WriteOptions(
+            include_header=False, batch_size=CSV_BATCH_SIZE, quoting_style="none"
+        )
+        with file_path.open("ab" if append else "wb") as f:
+            if not append:
+                f.write((header + "\n").encode("utf-8"))
+            pv.write_csv(table, f, write_options=write_options)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        if append and file_path.exists():
+            with file_path.open("r+b") as f:
+                f.truncate(start)
+        df.to_csv(file_path, mode="a" if append else "w", header=not append, index=False)
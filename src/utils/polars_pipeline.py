@@ -0,0 +1,86 @@
+"""
+utils/polars_pipeline.py
+
+Shared pieces of the --polars backend of the data preparation scripts.
+
+Each script expresses its cleaning steps as one lazy Polars query. Running it
+with run_lazy_pipeline scans the raw CSV, lets Polars optimize the whole plan
+(predicate/projection pushdown) and streams it to the prepared CSV instead of
+materializing a DataFrame after every step.
+
+Example:
+    from utils.polars_pipeline import run_lazy_pipeline
+    run_lazy_pipeline(raw_path, prepared_path, _lazy_clean_sales, NA_VALUES)
+
+"""
+
+import pathlib
+from typing import Any, Callable
+
+import polars as pl
+
+# loguru's shared logger: the sinks are set up by the calling script's logger module
+from loguru import logger
+
+
+def within_iqr(col: str) -> pl.Expr:
+    """
+    Return a filter keeping values of `col` within 1.5 IQR of its quartiles.
+
+    Parameters:
+        col (str): Name of a numeric column.
+
+    Returns:
+        pl.Expr: Boolean expression, False for outliers and nulls.
+    """
+    q1 = pl.col(col).quantile(0.25, interpolation='linear')
+    q3 = pl.col(col).quantile(0.75, interpolation='linear')
+    iqr = q3 - q1
+    return pl.col(col).is_between(q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+
+def most_common(col: str) -> pl.Expr:
+    """
+    Return the most common non-null value of `col`; ties resolve to the smallest.
+
+    Parameters:
+        col (str): Name of the column.
+
+    Returns:
+        pl.Expr: Scalar expression usable in fill_null.
+    """
+    return pl.col(col).drop_nulls().mode().sort().first()
+
+
+def run_lazy_pipeline(
+    input_path: pathlib.Path,
+    output_path: pathlib.Path,
+    clean: Callable[[pl.LazyFrame], pl.LazyFrame],
+    null_values: list[str],
+    schema_overrides: dict[str, Any] | None = None,
+) -> None:
+    """
+    Scan a raw CSV, apply a lazy cleaning query and sink the result to CSV.
+
+    Parameters:
+        input_path (pathlib.Path): Raw CSV to scan.
+        output_path (pathlib.Path): Prepared CSV to write.
+        clean (Callable): Builds the cleaning query from the scanned LazyFrame.
+        null_values (list[str]): Cell values read as null.
+        schema_overrides (dict, optional): Polars dtypes for columns whose inferred
+            type would differ from pandas.
+    """
+    lf = (
+        pl.scan_csv(
+            input_path,
+            infer_schema_length=1000,
+            null_values=null_values,
+            schema_overrides=schema_overrides,
+        )
+        # pandas skips blank lines; Polars reads them as all-null rows
+        .filter(pl.any_horizontal(pl.all().is_not_null()))
+        .pipe(clean)
+    )
+    logger.info(f"Lazy query plan:\n{lf.explain(engine='streaming')}")
+    lf.sink_csv(output_path)
+    logger.info(f"Data saved to {output_path}")
@@ -0,0 +1,161 @@
+"""
+Test file for the OLAP cube aggregation using Python's unittest framework.
+
+Checks that create_olap_cube on categorical dimensions matches a plain pandas
+groupby on the same values, including unused categories, missing dimension
+values and groups whose metric values are all missing, and that the in-memory
+cube read back from Parquet can be plotted by the profitability analysis.
+DWReader is also checked to reject table and column names outside the DW schema.
+"""
+
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+# This assumes the test runner has the project root in its path.
+from src.analytics_project.etl_to_dw import create_schema
+from src.analytics_project.olap import cubing
+from src.analytics_project.olap.cubing import create_olap_cube
+from src.analytics_project.olap.goal_profitability_analysis import build_pivot_table
+
+
+class TestCreateOlapCube(unittest.TestCase):
+    """Contains unit tests for create_olap_cube."""
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up sales rows once for all tests.
+
+        'south' and 'toys' are categories without any rows, two rows have a
+        missing dimension, and the east/home group has no sale amount at all.
+        """
+        cls.raw_df = pd.DataFrame(
+            {
+                'sale_id': [1, 2, 3, 4, 5, 6, 7, 8],
+                'region': ['east', 'east', 'west', 'west', np.nan, 'east', 'west', 'east'],
+                'category': ['home', 'home', 'home', 'tech', 'tech', np.nan, 'tech', 'tech'],
+                'sale_amount': [np.nan, np.nan, 10.1, 20.2, 5.0, 7.0, 0.3, 1.5],
+            }
+        )
+        cls.dimensions = ['region', 'category']
+        cls.metrics = {'sale_amount': ['sum', 'mean'], 'sale_id': 'count'}
+
+    def expected_cube(self) -> pd.DataFrame:
+        """Aggregates the raw (non-categorical) rows with a plain groupby."""
+        expected = (
+            self.raw_df.groupby(self.dimensions, dropna=True)
+            .agg(
+                sale_amount_sum=('sale_amount', 'sum'),
+                sale_amount_mean=('sale_amount', 'mean'),
+                sale_id_count=('sale_id', 'count'),
+            )
+            .reset_index()
+        )
+        return expected
+
+    def test_categorical_dimensions_match_groupby(self):
+        """Tests that categorical dimensions give the same rows and values as groupby."""
+        df = self.raw_df.assign(
+            region=pd.Categorical(self.raw_df['region'], categories=['east', 'south', 'west']),
+            category=pd.Categorical(self.raw_df['category'], categories=['home', 'tech', 'toys']),
+        )
+        cube = create_olap_cube(df, self.dimensions, self.metrics)
+
+        expected = self.expected_cube()
+        pd.testing.assert_frame_equal(
+            cube.astype({'region': str, 'category': str}), expected, check_exact=False
+        )
+
+    def test_empty_groups_and_missing_dimensions_are_dropped(self):
+        """Tests that unused categories and rows with a missing dimension give no cube rows."""
+        df = self.raw_df.astype({'region': 'category', 'category': 'category'})
+        cube = create_olap_cube(df, self.dimensions, self.metrics)
+
+        self.assertEqual(len(cube), 4)
+        self.assertFalse(cube[self.dimensions].isna().any().any())
+        self.assertEqual(cube['sale_id_count'].sum(), 6)
+
+    def test_all_missing_metric_group(self):
+        """Tests that a group without any sale amount sums to 0.0 with a missing mean."""
+        df = self.raw_df.astype({'region': 'category', 'category': 'category'})
+        cube = create_olap_cube(df, self.dimensions, self.metrics)
+
+        east_home = cube[(cube['region'] == 'east') & (cube['category'] == 'home')].iloc[0]
+        self.assertEqual(east_home['sale_amount_sum'], 0.0)
+        self.assertTrue(np.isnan(east_home['sale_amount_mean']))
+        self.assertEqual(east_home['sale_id_count'], 2)
+
+
+class TestInMemoryCube(unittest.TestCase):
+    """Contains unit tests for the --in-memory cube and its analysis inputs."""
+
+    def setUp(self):
+        """Creates a small DW in a temporary folder."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = pathlib.Path(self.tmp.name)
+        self.db_path = self.tmp_dir / 'dw.db'
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            create_schema(cursor)
+            cursor.executemany(
+                'INSERT INTO customer (customer_id, region) VALUES (?, ?)',
+                [(1, 'East'), (2, 'West')],
+            )
+            cursor.executemany(
+                'INSERT INTO product (product_id, category) VALUES (?, ?)',
+                [(10, 'home'), (11, 'tech')],
+            )
+            cursor.executemany(
+                'INSERT INTO sale (sale_id, customer_id, product_id, sale_amount)'
+                ' VALUES (?, ?, ?, ?)',
+                [(1, 1, 10, 10.5), (2, 1, 11, 20.0), (3, 2, 10, 5.25), (4, 1, 10, 1.0)],
+            )
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parquet_cube_feeds_the_heatmap(self):
+        """Tests that the cube written to Parquet pivots into a numeric heatmap input."""
+        cube = cubing.build_cube_in_memory(self.db_path)
+        with mock.patch.object(cubing, 'OLAP_OUTPUT_DIR', self.tmp_dir):
+            cubing.write_cube(cube, cubing.CUBE_FILENAME)
+        cube_df = pd.read_parquet(self.tmp_dir / cubing.CUBE_FILENAME)
+
+        self.assertEqual(cube_df['sale_amount_sum'].dtype, np.float64)
+        self.assertEqual(cube_df['sale_id_count'].dtype, np.int64)
+
+        pivot_table = build_pivot_table(cube_df)
+        self.assertTrue(all(dtype == np.float64 for dtype in pivot_table.dtypes))
+        self.assertEqual(pivot_table.loc['home', 'East'], 11.5)
+        self.assertEqual(pivot_table.loc['tech', 'West'], 0.0)
+
+        # The analysis plots this table; object-dtype data made sns.heatmap raise
+        fig = plt.figure()
+        try:
+            sns.heatmap(pivot_table, annot=True, fmt=",.0f")
+        finally:
+            plt.close(fig)
+
+    def test_reader_rejects_unknown_identifiers(self):
+        """Tests that DWReader only builds SELECTs from known table and column names."""
+        with cubing.DWReader(self.db_path) as dw:
+            self.assertEqual(list(dw.dim('customer', ['region'])['region']), ['East', 'West'])
+            with self.assertRaises(ValueError):
+                dw.dim('sale; DROP TABLE sale', ['sale_id'])
+            with self.assertRaises(ValueError):
+                dw.dim('product', ['category', '1 AS category'])
+            with self.assertRaises(ValueError):
+                dw.sales(['sale_id', 'region'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Test file for the data_prep cleaning pipeline using Python's unittest framework.
+
+Checks that malformed numeric cells only drop their own row instead of
+failing the whole file, and that chunked streaming gives the same rows as
+cleaning the whole file at once.
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+# This assumes the test runner has the project root in its path.
+from src.analytics_project import data_prep
+
+
+class TestCleanSalesData(unittest.TestCase):
+    """Contains unit tests for clean_sales_data."""
+
+    def setUp(self):
+        """Creates raw sales rows as read_data would return them (unpinned dtypes)."""
+        self.raw_df = pd.DataFrame(
+            {
+                'TransactionID': [1, 2, 3],
+                'SaleDate': ['5/4/2025', '5/4/2025', '5/5/2025'],
+                'CustomerID': [1034, 1066, 1116],
+                'ProductID': ['2059', '2048', '2041'],
+                'StoreID': [402, 403, 403],
+                'CampaignID': [0.0, 1.0, None],
+                'SaleAmount': ['2048.2', '$321.87', '3216.84'],
+                'DiscountPercent': ['25', '25', '6%'],
+                'PaymentType': ['Cash', None, 'Cash'],
+            }
+        )
+
+    def test_malformed_sale_amount_drops_only_its_row(self):
+        """Tests that '$321.87' becomes NaN and only that row is dropped."""
+        df_clean = data_prep.clean_sales_data(self.raw_df.copy())
+
+        self.assertEqual(df_clean['TransactionID'].tolist(), [1, 3])
+        self.assertTrue(pd.api.types.is_float_dtype(df_clean['SaleAmount']))
+        self.assertEqual(df_clean['SaleAmount'].tolist(), [2048.2, 3216.84])
+        self.assertEqual(df_clean['DiscountPercent'].tolist(), [25.0, 6.0])
+
+
+class TestStreamProcess(unittest.TestCase):
+    """Contains unit tests for the chunked stream_process path."""
+
+    def setUp(self):
+        """Writes a raw customer CSV whose duplicates are spread across chunks."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = pathlib.Path(self.tmp.name)
+        self.raw_path = self.tmp_dir / 'customers_data.csv'
+        self.raw_path.write_text(
+            'CustomerID,Name,Region,JoinDate,LoyaltyPoints,PreferredContactMethod\n'
+            '1000,Robert Gomez,West,2/25/2024,486,Text\n'
+            '1001,John Silva,East,12/1/2020,449,NULL\n'
+            '1000,Robert Gomez,West,2/25/2024,486,Text\n'
+            '1002,Mark Marshall,Central,8/8/2020,456,Text\n'
+            '1001,John Silva,East,12/1/2020,449,NULL\n'
+            '1003,David Brennan,North,5/21/2020,429,Email\n'
+            '1002,Mark Marshall,Central,8/8/2020,456,Text\n'
+        )
+        self.prepared_dir = data_prep.PREPARED_DATA_DIR
+        data_prep.PREPARED_DATA_DIR = self.tmp_dir
+
+    def tearDown(self):
+        data_prep.PREPARED_DATA_DIR = self.prepared_dir
+        self.tmp.cleanup()
+
+    def test_duplicates_across_chunks_match_whole_file(self):
+        """Tests that rows repeated in later chunks are dropped like a whole-file clean."""
+        whole = data_prep.clean_customer_data(
+            data_prep.read_data(self.raw_path, data_prep.CUSTOMER_READ)
+        )
+        chunks = list(
+            data_prep.stream_process(
+                self.raw_path,
+                'customers_prepared.csv',
+                data_prep.clean_customer_data,
+                data_prep.CUSTOMER_READ,
+                chunksize=2,
+            )
+        )
+        streamed = pd.concat(chunks, ignore_index=True)
+
+        self.assertEqual(streamed['CustomerID'].tolist(), [1000, 1001, 1002, 1003])
+        self.assertEqual(streamed['CustomerID'].tolist(), whole['CustomerID'].tolist())
+        self.assertEqual(streamed['Name'].tolist(), whole['Name'].tolist())
+
+        prepared = pd.read_csv(self.tmp_dir / 'customers_prepared.csv')
+        self.assertEqual(prepared['CustomerID'].tolist(), [1000, 1001, 1002, 1003])
+
+    def test_duplicates_with_chunk_dependent_dtypes(self):
+        """Tests that a row repeated in a chunk that parsed its columns differently is dropped."""
+        raw_path = self.tmp_dir / 'sales_data.csv'
+        # CampaignID is float64 in the first chunk (missing value) and int64 in the second
+        raw_path.write_text(
+            'TransactionID,SaleDate,CustomerID,ProductID,StoreID,CampaignID,SaleAmount,'
+            'DiscountPercent,PaymentType\n'
+            '1,5/4/2025,1034,2059,402,2,2048.2,25,Cash\n'
+            '2,5/4/2025,1066,2048,403,,321.87,25,Cash\n'
+            '3,5/5/2025,1116,2041,403,3,3216.84,6,Cash\n'
+            '1,5/4/2025,1034,2059,402,2,2048.2,25,Cash\n'
+        )
+        whole = data_prep.clean_sales_data(data_prep.read_data(raw_path, data_prep.SALES_READ))
+        chunks = data_prep.stream_process(
+            raw_path,
+            'sales_prepared.csv',
+            data_prep.clean_sales_data,
+            data_prep.SALES_READ,
+            chunksize=2,
+        )
+        streamed = pd.concat(list(chunks), ignore_index=True)
+
+        self.assertEqual(streamed['TransactionID'].tolist(), [1, 2, 3])
+        self.assertEqual(streamed['TransactionID'].tolist(), whole['TransactionID'].tolist())
+
+
+class TestReadData(unittest.TestCase):
+    """Contains unit tests for read_data's Parquet cache."""
+
+    def setUp(self):
+        """Writes a raw CSV with a missing-value token into a temporary folder."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raw_path = pathlib.Path(self.tmp.name) / 'products_data.csv'
+        self.raw_path.write_text('ProductID,SupplierName\n2000,NULL\n2001,TechSource\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def cache_files(self) -> list:
+        return list(self.raw_path.parent.glob('*.parquet'))
+
+    def test_cache_is_keyed_by_read_options(self):
+        """Tests that a read with other options does not reuse the cached frame."""
+        with_na = data_prep.read_data(self.raw_path, {'na_values': ['NULL']})
+        without_na = data_prep.read_data(
+            self.raw_path, {'na_values': [], 'keep_default_na': False}
+        )
+
+        self.assertTrue(pd.isna(with_na['SupplierName'].iloc[0]))
+        self.assertEqual(without_na['SupplierName'].iloc[0], 'NULL')
+
+        # A repeated read with the same options comes from its own cache file
+        again = data_prep.read_data(self.raw_path, {'na_values': ['NULL']})
+        pd.testing.assert_frame_equal(again, with_na)
+
+    def test_new_cache_replaces_stale_ones(self):
+        """Tests that writing a cache removes the CSV's caches for other read options."""
+        options = {'na_values': ['NULL']}
+        data_prep.read_data(self.raw_path, {'na_values': [], 'keep_default_na': False})
+        data_prep.read_data(self.raw_path, options)
+
+        self.assertEqual(self.cache_files(), [data_prep.read_cache_path(self.raw_path, options)])
+
+        # Reading the cache back does not rewrite or remove it
+        data_prep.read_data(self.raw_path, options)
+        self.assertEqual(len(self.cache_files()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
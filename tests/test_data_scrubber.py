@@ -16,10 +16,14 @@ from src.utils.data_scrubber import DataScrubber
 class TestDataScrubber(unittest.TestCase):
     """Contains unit tests for the DataScrubber class."""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Sets up a raw data DataFrame ('dirty data') for each test.
+        Sets up a raw data DataFrame ('dirty data') once for all tests.
         This dataset includes duplicates, missing values, and incorrect types.
+
+        Tests whose scrubber methods assign columns in place work on a copy;
+        methods that return a new DataFrame get the shared frame directly.
         """
         data = {
             'ID': [1, 2, 3, 4, 1, 5, 6, 7],
@@ -29,11 +33,11 @@ class TestDataScrubber(unittest.TestCase):
             # The Status column contains inconsistent casing/whitespace
             'Status': ['Active', ' ACTIVE ', 'Inactive', 'Inactive', 'Active', 'Active', 'Active', 'ACTIVE']
         }
-        self.raw_df = pd.DataFrame(data)
+        cls.raw_df = pd.DataFrame(data)
 
     def test_remove_duplicate_records(self):
         """Tests the correct removal of duplicate rows."""
-        scrubber = DataScrubber(self.raw_df.copy())
+        scrubber = DataScrubber(self.raw_df)
         df_clean = scrubber.remove_duplicate_records()
         # There are 2 duplicate rows in the raw data
         self.assertEqual(len(df_clean), 7)
@@ -41,7 +45,7 @@ class TestDataScrubber(unittest.TestCase):
 
     def test_handle_missing_data_fill(self):
         """Tests filling missing values with a default value."""
-        scrubber = DataScrubber(self.raw_df.copy())
+        scrubber = DataScrubber(self.raw_df)
         df_clean = scrubber.handle_missing_data(fill_value='MISSING')
         # Check if all NaN 'Name' values were replaced by 'MISSING'
         self.assertEqual(df_clean['Name'].isnull().sum(), 0)
@@ -49,7 +53,7 @@ class TestDataScrubber(unittest.TestCase):
 
     def test_handle_missing_data_drop(self):
         """Tests dropping rows containing missing values."""
-        scrubber = DataScrubber(self.raw_df.copy())
+        scrubber = DataScrubber(self.raw_df)
         df_clean = scrubber.handle_missing_data(drop=True)
         # Rows with np.nan (Name, Amount) should be dropped. Total 6 remaining rows.
         # ID=4 (Amount=NaN) and ID=5 (Name=NaN) are the ones dropped.
@@ -67,6 +71,29 @@ class TestDataScrubber(unittest.TestCase):
         # Compare the cleaned series with the expected series
         pd.testing.assert_series_equal(df_clean['Status'], expected_status, check_names=False)
 
+    def test_format_column_strings_to_lower_and_trim_keeps_missing(self):
+        """Tests that missing values are left as missing when formatting strings."""
+        scrubber = DataScrubber(self.raw_df.copy())
+        df_clean = scrubber.format_column_strings_to_lower_and_trim('Name')
+
+        expected_name = pd.Series(['alice', 'bob', 'charlie', 'david', 'alice', np.nan, 'eve', 'frank'])
+        pd.testing.assert_series_equal(df_clean['Name'], expected_name, check_names=False)
+
+        # A filtered (non-default) index must line up with the formatted values
+        scrubber = DataScrubber(self.raw_df.iloc[2:4].copy())
+        df_clean = scrubber.format_column_strings_to_lower_and_trim('Name')
+        self.assertEqual(df_clean['Name'].tolist(), ['charlie', 'david'])
+
+    def test_format_categorical_column_strings(self):
+        """Tests that category normalization merges spellings that differ only by case/whitespace."""
+        scrubber = DataScrubber(self.raw_df.copy())
+        df_clean = scrubber.format_categorical_column_strings('Status')
+
+        self.assertIsInstance(df_clean['Status'].dtype, pd.CategoricalDtype)
+        self.assertEqual(sorted(df_clean['Status'].cat.categories), ['active', 'inactive'])
+        expected_status = ['active', 'active', 'inactive', 'inactive', 'active', 'active', 'active', 'active']
+        self.assertEqual(df_clean['Status'].tolist(), expected_status)
+
 
     def test_parse_dates_to_add_standard_datetime(self):
         """Tests converting a date column to the standard datetime type."""
@@ -86,7 +113,7 @@ class TestDataScrubber(unittest.TestCase):
 
     def test_rename_columns(self):
         """Tests correct column renaming."""
-        scrubber = DataScrubber(self.raw_df.copy())
+        scrubber = DataScrubber(self.raw_df)
         mapping = {'Name': 'Client_Name', 'Amount': 'Purchase_Value'}
         df_clean = scrubber.rename_columns(mapping)
         self.assertIn('Client_Name', df_clean.columns)
@@ -96,8 +123,10 @@ class TestDataScrubber(unittest.TestCase):
     def test_convert_column_to_new_data_type(self):
         """Tests converting a column to a numeric type."""
         scrubber = DataScrubber(self.raw_df.copy())
-        # Pre-correction: replace comma with dot and convert to numeric, handling NaN
-        scrubber.df['Amount'] = scrubber.df['Amount'].astype(str).str.replace(',', '.', regex=False)
+        # Pre-correction: replace comma with dot in the string cells only (numeric cells
+        # are left as they are), then convert to numeric, handling NaN
+        is_text = scrubber.df['Amount'].map(type).eq(str)
+        scrubber.df.loc[is_text, 'Amount'] = scrubber.df.loc[is_text, 'Amount'].str.replace(',', '.', regex=False)
         scrubber.df['Amount'] = pd.to_numeric(scrubber.df['Amount'], errors='coerce')
         
         df_clean = scrubber.convert_column_to_new_data_type('Amount', 'float')
@@ -0,0 +1,78 @@
+"""
+Test file for the write_prepared_data helper using Python's unittest framework.
+
+Checks that the Arrow-based writer produces CSV that pandas reads back
+unchanged, that chunks can be appended, and that it falls back to pandas
+when values need quoting.
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# This assumes the test runner has the project root in its path.
+from src.utils.data_writer import write_prepared_data
+
+
+class TestDataWriter(unittest.TestCase):
+    """Contains unit tests for write_prepared_data."""
+
+    def setUp(self):
+        """Creates a small prepared-looking DataFrame and a temporary output folder."""
+        self.df = pd.DataFrame(
+            {
+                'ID': [1, 2, 3],
+                'Name': ['alice', 'bob', None],
+                'Amount': [100.5, 200.25, None],
+                'Date': pd.to_datetime(['2023-01-01', '2023-01-02', None]),
+            }
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out_dir = pathlib.Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_matches_pandas_output(self):
+        """Tests that the Arrow CSV is byte-identical to DataFrame.to_csv for plain data."""
+        path = self.out_dir / 'out.csv'
+        write_prepared_data(self.df, path)
+        self.assertEqual(path.read_text(), self.df.to_csv(index=False))
+
+    def test_csv_matches_pandas_floats_bools_and_times(self):
+        """Tests that whole floats, bools and datetimes are formatted like DataFrame.to_csv."""
+        df = self.df.assign(
+            Amount=[866.0, -0.0, None],
+            Active=[True, False, True],
+            Date=pd.to_datetime(['2023-01-01 12:30', '2023-01-02 00:00', None]),
+        )
+        path = self.out_dir / 'out.csv'
+        write_prepared_data(df, path)
+        self.assertEqual(path.read_text(), df.to_csv(index=False))
+
+    def test_csv_append_writes_header_once(self):
+        """Tests that appended chunks match writing the whole frame at once."""
+        path = self.out_dir / 'out.csv'
+        write_prepared_data(self.df.iloc[:2], path)
+        write_prepared_data(self.df.iloc[2:], path, append=True)
+        self.assertEqual(path.read_text(), self.df.to_csv(index=False))
+
+    def test_csv_falls_back_when_quoting_needed(self):
+        """Tests that values containing commas are still written as valid CSV."""
+        df = self.df.assign(Name=['smith, alice', 'bob', np.nan])
+        path = self.out_dir / 'out.csv'
+        write_prepared_data(df, path)
+        pd.testing.assert_frame_equal(pd.read_csv(path, parse_dates=['Date']), df)
+
+    def test_parquet_round_trip(self):
+        """Tests that a .parquet path writes Parquet that reads back unchanged."""
+        path = self.out_dir / 'out.parquet'
+        write_prepared_data(self.df, path)
+        pd.testing.assert_frame_equal(pd.read_parquet(path), self.df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Test file for the DW row inserters using Python's unittest framework.
+
+Loads rows into an in-memory SQLite table through prepare_insert and
+make_row_inserter, covering full multi-row chunks, the executemany tail,
+duplicate keys and missing-value tokens.
+"""
+
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+
+# This assumes the test runner has the project root in its path.
+from src.analytics_project.etl_to_dw import (
+    iter_table_rows,
+    make_row_inserter,
+    prepare_insert,
+    read_prepared_table,
+)
+
+ITEM_INSERT_SQL = prepare_insert('item', ['item_id', 'name', 'price'], 'item_id')
+insert_item_rows = make_row_inserter(ITEM_INSERT_SQL)
+
+
+class TestRowInserter(unittest.TestCase):
+    """Contains unit tests for prepare_insert and make_row_inserter."""
+
+    def setUp(self):
+        """Creates an empty in-memory table with a primary key and a NOT NULL column."""
+        self.conn = sqlite3.connect(':memory:')
+        self.cursor = self.conn.cursor()
+        self.cursor.execute(
+            'CREATE TABLE item (item_id INTEGER PRIMARY KEY, name TEXT NOT NULL, price REAL)'
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def fetch_items(self) -> list[tuple]:
+        sql = 'SELECT item_id, name, price FROM item ORDER BY item_id'
+        return self.cursor.execute(sql).fetchall()
+
+    def make_rows(self, n: int) -> list[tuple]:
+        return [(str(i), f'item {i}', f'{i}.5') for i in range(n)]
+
+    def test_exactly_one_chunk(self):
+        """Tests that chunk_rows rows are all inserted by one multi-row statement."""
+        n = ITEM_INSERT_SQL.chunk_rows
+        insert_item_rows(self.cursor, self.make_rows(n))
+
+        items = self.fetch_items()
+        self.assertEqual(len(items), n)
+        # Numeric text is stored as numbers by the column affinity
+        self.assertEqual(items[-1], (n - 1, f'item {n - 1}', n - 0.5))
+
+    def test_one_row_past_a_chunk(self):
+        """Tests that the row left after a full chunk goes in through the executemany tail."""
+        n = ITEM_INSERT_SQL.chunk_rows + 1
+        insert_item_rows(self.cursor, iter(self.make_rows(n)))
+
+        items = self.fetch_items()
+        self.assertEqual(len(items), n)
+        self.assertEqual(items[-1], (n - 1, f'item {n - 1}', n - 0.5))
+
+    def test_duplicate_keys_keep_first_row(self):
+        """Tests that a repeated key is skipped, within a chunk and in the tail."""
+        rows = self.make_rows(ITEM_INSERT_SQL.chunk_rows)
+        rows[5] = ('0', 'duplicate in chunk', '1.0')
+        rows.append(('1', 'duplicate in tail', '2.0'))
+        insert_item_rows(self.cursor, rows)
+
+        items = self.fetch_items()
+        self.assertEqual(len(items), ITEM_INSERT_SQL.chunk_rows - 1)
+        self.assertEqual(items[0], (0, 'item 0', 0.5))
+        self.assertEqual(items[1], (1, 'item 1', 1.5))
+
+    def test_not_null_violation_raises(self):
+        """Tests that only key conflicts are skipped; other constraint errors still raise."""
+        with self.assertRaises(sqlite3.IntegrityError):
+            insert_item_rows(self.cursor, [('1', None, '2.0')])
+
+    def test_na_tokens_load_as_null(self):
+        """Tests that missing-value tokens in a prepared CSV are inserted as NULL."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = pathlib.Path(tmp) / 'items_prepared.csv'
+            csv_path.write_text(
+                'ItemID,Name,Price\n1,a,NULL\n2,b,\n3,c,NaN\n4,d,N/A\n5,e,7.25\n'
+            )
+            table = read_prepared_table(csv_path, ['ItemID', 'Name', 'Price'])
+            insert_item_rows(self.cursor, iter_table_rows(table))
+
+        prices = [price for _, _, price in self.fetch_items()]
+        self.assertEqual(prices, [None, None, None, None, 7.25])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Test file for the prepare_sales_data script using Python's unittest framework.
+
+Checks that the lazy Polars backend (--polars) writes the same prepared CSV
+as the pandas steps for the raw sales data.
+"""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+# This assumes the test runner has the project root in its path.
+from src.analytics_project.data_preparation import prepare_sales_data
+
+
+class TestPolarsBackend(unittest.TestCase):
+    """Contains unit tests comparing the pandas and Polars sales pipelines."""
+
+    def setUp(self):
+        """Points the prepared-data folder at a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prepared_dir = pathlib.Path(self.tmp.name)
+        patcher = mock.patch.object(prepare_sales_data, 'PREPARED_DATA_DIR', self.prepared_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_backend(self, polars_backend: bool) -> str:
+        prepare_sales_data.main(polars_backend=polars_backend)
+        return (self.prepared_dir / 'sales_prepared.csv').read_text()
+
+    def test_polars_output_matches_pandas(self):
+        """Tests that both backends write byte-identical prepared sales data."""
+        pandas_csv = self.run_backend(polars_backend=False)
+        polars_csv = self.run_backend(polars_backend=True)
+
+        self.assertEqual(polars_csv, pandas_csv)
+        # CampaignID is written as a float and DiscountPercent as a whole number
+        self.assertIn('\n1,2025-05-04,1034,2059,402,0.0,2048.2,25,Cash\n', polars_csv)
+
+
+if __name__ == '__main__':
+    unittest.main()